@@ -2,16 +2,28 @@
 DaVinci Resolve AI Agent - An intelligent copilot for video editing
 """
 
-from .core import ResolveAgent, AgentContext, AgentState
-from .planner import TaskPlanner, Plan, PlanStep
-from .executor import TaskExecutor
-from .vision import VideoAnalyzer
-from .rag import ResolveDocRAG
-from .feedback import FeedbackLoop, ValidationResult
-from .memory import MemoryManager
+from importlib import import_module
 
 __version__ = "1.0.0"
 
+# Public names map to the submodule that defines them; they are imported on
+# first attribute access so heavy components (vision, RAG, memory) only load
+# when actually used
+_LAZY_EXPORTS = {
+    'ResolveAgent': '.core',
+    'AgentContext': '.core',
+    'AgentState': '.core',
+    'TaskPlanner': '.planner',
+    'Plan': '.planner',
+    'PlanStep': '.planner',
+    'TaskExecutor': '.executor',
+    'VideoAnalyzer': '.vision',
+    'ResolveDocRAG': '.rag',
+    'FeedbackLoop': '.feedback',
+    'ValidationResult': '.feedback',
+    'MemoryManager': '.memory'
+}
+
 __all__ = [
     'ResolveAgent',
     'AgentContext',
@@ -25,4 +37,19 @@ __all__ = [
     'FeedbackLoop',
     'ValidationResult',
     'MemoryManager'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """Import public names from their submodule on first access"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Include the lazily imported names in dir()"""
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
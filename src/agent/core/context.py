@@ -19,6 +19,8 @@ class AgentContext:
         self.timestamp = datetime.now()
         self.session_id = self._generate_session_id()
         self.resolve_state = {}
+        # session_id never changes after init, so its JSON fragment is built once
+        self._json_prefix = '{\n  "session_id": ' + json.dumps(self.session_id) + ',\n'
         
     def update_user_request(self, request: str):
         """Update the current user request"""
@@ -65,4 +67,15 @@ class AgentContext:
         
     def to_json(self) -> str:
         """Convert context to JSON"""
-        return json.dumps(self.get_full_context(), indent=2)
\ No newline at end of file
+        # Only the mutable fields are serialized; the leading '{\n' of the
+        # dumped object is replaced by the precomputed session_id prefix
+        variable = json.dumps({
+            'user_request': self.user_request,
+            'current_project': self.current_project,
+            'current_timeline': self.current_timeline,
+            'current_clip': self.current_clip,
+            'external_context': self.external_context,
+            'timestamp': self.timestamp.isoformat(),
+            'resolve_state': self.resolve_state
+        }, indent=2)
+        return self._json_prefix + variable[2:]
\ No newline at end of file
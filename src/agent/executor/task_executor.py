@@ -8,10 +8,13 @@ from typing import Dict, Any, List, Optional
 from concurrent.futures import ThreadPoolExecutor
 import traceback
 
-from ..planner.plan import Plan, PlanStep, StepType
+from ..planner.plan import Plan, PlanStep, StepType, STEP_TYPE_VALUES
 
 logger = logging.getLogger(__name__)
 
+# Returned by _run_step when a failed step will be retried in a later wave
+_RETRY = object()
+
 
 class TaskExecutor:
     """Executes plans by calling the appropriate APIs"""
@@ -19,6 +22,8 @@ class TaskExecutor:
     def __init__(self, resolve_server):
         self.resolve_server = resolve_server
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self._tool_table = None
+        self._tool_table_version = None
         
     async def execute_plan(self, plan: Plan) -> Dict[str, Any]:
         """
@@ -41,31 +46,37 @@ class TaskExecutor:
                 logger.error("No executable steps found but plan not complete")
                 break
                 
-            # Execute steps in parallel where possible
-            step_results = await asyncio.gather(
-                *[self._execute_step(step) for step in next_steps],
-                return_exceptions=True
-            )
-            
+            # Execute steps in parallel where possible; a step that runs out
+            # of retries cancels the rest of the wave
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [
+                        (step, tg.create_task(self._run_step(plan, step)))
+                        for step in next_steps
+                    ]
+            except ExceptionGroup as eg:
+                plan.mark_batch({
+                    step.step_id: task.result()
+                    for step, task in tasks
+                    if task.done() and not task.cancelled()
+                    and task.exception() is None and task.result() is not _RETRY
+                })
+                raise eg.exceptions[0]
+                
             # Process results
-            for step, result in zip(next_steps, step_results):
-                if isinstance(result, Exception):
-                    plan.mark_step_failed(step.step_id, str(result))
-                    logger.error(f"Step {step.step_id} failed: {result}")
+            completed = {}
+            for step, task in tasks:
+                result = task.result()
+                if result is _RETRY:
+                    continue
+                completed[step.step_id] = result
+                results.append({
+                    'step': step.action,
+                    'result': result
+                })
                     
-                    # Check if we should retry
-                    if step.retry_count < step.max_retries:
-                        step.executed = False  # Reset for retry
-                        continue
-                    else:
-                        # Max retries exceeded
-                        raise result
-                else:
-                    plan.mark_step_complete(step.step_id, result)
-                    results.append({
-                        'step': step.action,
-                        'result': result
-                    })
+            # Record the whole wave of successful steps at once
+            plan.mark_batch(completed)
                     
         return {
             'success': plan.is_complete(),
@@ -74,9 +85,24 @@ class TaskExecutor:
             'executed_actions': plan.get_executed_actions()
         }
         
+    async def _run_step(self, plan: Plan, step: PlanStep) -> Any:
+        """Execute a step within a wave, absorbing failures that can still be retried"""
+        try:
+            return await self._execute_step(step)
+        except Exception as e:
+            plan.mark_step_failed(step.step_id, str(e))
+            logger.error(f"Step {step.step_id} failed: {e}")
+            
+            # Check if we should retry
+            if step.retry_count < step.max_retries:
+                step.executed = False  # Reset for retry
+                return _RETRY
+            # Max retries exceeded
+            raise
+            
     async def _execute_step(self, step: PlanStep) -> Any:
         """Execute a single step"""
-        logger.info(f"Executing step: {step.action} ({step.step_type.value})")
+        logger.info(f"Executing step: {step.action} ({STEP_TYPE_VALUES[step.step_type]})")
         
         try:
             if step.step_type == StepType.RESOLVE_API:
@@ -102,24 +128,11 @@ class TaskExecutor:
         action = step.action
         params = step.parameters
         
-        # Get all tools from the MCP server
-        tools = {}
-        
-        # Tools are stored in the _tools dictionary
-        if hasattr(self.resolve_server, '_tools'):
-            tools.update(self.resolve_server._tools)
-        
-        # Resources are stored in the _resources dictionary
-        if hasattr(self.resolve_server, '_resources'):
-            # Resources can be called as read-only operations
-            for resource_name, resource_func in self.resolve_server._resources.items():
-                # Convert resource to callable tool format
-                tools[f"get_{resource_name}"] = resource_func
+        tools = self._get_tools()
         
         # Find the matching tool
-        if action in tools:
-            tool_func = tools[action]
-            
+        tool_func = tools.get(action)
+        if tool_func is not None:
             # Run in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
             result = await loop.run_in_executor(
@@ -128,18 +141,47 @@ class TaskExecutor:
             )
             return result
         else:
-            # Try with get_ prefix for resources
-            if f"get_{action}" in tools:
-                tool_func = tools[f"get_{action}"]
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(
-                    self.executor,
-                    lambda: tool_func(**params) if params else tool_func()
-                )
-                return result
-            
             raise ValueError(f"Unknown Resolve API action: {action}")
             
+    def invalidate_tools(self):
+        """Drop the merged tool table; call after tools or resources are registered or replaced"""
+        self._tool_table = None
+        self._tool_table_version = None
+        
+    def _get_tools(self) -> Dict[str, Any]:
+        """Get the merged tool table, rebuilding it when invalidated or the server's registries change"""
+        server_tools = getattr(self.resolve_server, '_tools', None)
+        server_resources = getattr(self.resolve_server, '_resources', None)
+        # Identity and size only catch swapped registries and added entries;
+        # replacing an entry in place needs an explicit invalidate_tools()
+        version = (id(server_tools), len(server_tools or ()),
+                   id(server_resources), len(server_resources or ()))
+        
+        if self._tool_table is not None and self._tool_table_version == version:
+            return self._tool_table
+            
+        tools = {}
+        
+        # Tools are stored in the _tools dictionary
+        if server_tools is not None:
+            tools.update(server_tools)
+        
+        # Resources are stored in the _resources dictionary
+        if server_resources is not None:
+            # Resources can be called as read-only operations
+            for resource_name, resource_func in server_resources.items():
+                # Convert resource to callable tool format
+                tools[f"get_{resource_name}"] = resource_func
+                
+        # Pre-bake the get_ prefix fallback so lookups need no string building
+        for name, func in list(tools.items()):
+            if name.startswith("get_") and name[4:] not in tools:
+                tools[name[4:]] = func
+                
+        self._tool_table = tools
+        self._tool_table_version = version
+        return tools
+        
     async def _execute_video_analysis(self, step: PlanStep) -> Any:
         """Execute video analysis (placeholder for now)"""
         # This would integrate with video understanding models
@@ -187,16 +229,26 @@ class TaskExecutor:
         
     async def _execute_composite(self, step: PlanStep) -> Any:
         """Execute composite step (multiple actions)"""
-        sub_results = []
-        
-        for sub_action in step.parameters.get('actions', []):
-            sub_step = PlanStep(
+        sub_steps = [
+            PlanStep(
                 step_type=StepType.RESOLVE_API,
                 action=sub_action['action'],
                 parameters=sub_action.get('parameters', {})
             )
-            result = await self._execute_step(sub_step)
-            sub_results.append(result)
+            for sub_action in step.parameters.get('actions', [])
+        ]
+        
+        if step.parameters.get('parallel', True):
+            # Sub-actions are independent, run them concurrently
+            sub_results = list(await asyncio.gather(
+                *[self._execute_step(sub_step) for sub_step in sub_steps]
+            ))
+        else:
+            # Ordering matters, run them one after another
+            sub_results = []
+            for sub_step in sub_steps:
+                result = await self._execute_step(sub_step)
+                sub_results.append(result)
             
         return {
             'composite_results': sub_results
@@ -2,21 +2,51 @@
 Feedback loop for error correction and continuous improvement
 """
 
+import asyncio
 import logging
 import re
+import secrets
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from .validation import ValidationResult, ValidationError
+from .keyword_matcher import KeywordAutomaton, keywords_in_order
+from ..planner.plan import Plan, PlanStep, StepType
 
 logger = logging.getLogger(__name__)
 
+# Fixed plan templates kept for reuse, least recently used evicted first
+FIX_CACHE_SIZE = 128
+
+# Matches feedback like "should have done X instead of Y"
+FIX_PATTERN = re.compile(r'should (?:have )?(.+) instead of (.+)', re.IGNORECASE)
+
+# Recovery step templates: (step_type, action, parameters, expected_outcome)
+CONNECTION_RECOVERY_STEPS = (
+    (StepType.VALIDATION, "check_resolve_running", {}, "DaVinci Resolve is running"),
+    (StepType.RESOLVE_API, "restart_app", {'wait_seconds': 10}, "DaVinci Resolve restarted"),
+)
+
+NO_PROJECT_RECOVERY_STEPS = (
+    (StepType.RESOLVE_API, "list_projects", {}, "Get available projects"),
+    (StepType.RESOLVE_API, "open_project", {'name': 'AutoRecovery'}, "Project opened"),  # This would be dynamic
+)
+
+TIMELINE_RECOVERY_STEPS = (
+    (StepType.RESOLVE_API, "create_empty_timeline", {'name': 'Recovery Timeline'}, "Timeline created"),
+)
+
 
 class FeedbackLoop:
     """Handles validation, error correction, and learning from feedback"""
     
     def __init__(self):
         self.error_patterns = self._initialize_error_patterns()
+        self._error_keywords, self._error_automaton = self._compile_error_patterns(self.error_patterns)
         self.correction_strategies = self._initialize_correction_strategies()
+        self._strategy_automaton = None  # built lazily over normalized strategy keys
+        self._strategy_keys = {}
         self.learned_patterns = {}
+        self._fix_cache = OrderedDict()  # (plan signature, error signature) -> fixed plan template
         
     async def validate_result(self, plan: Any, result: Dict[str, Any], context: Any) -> ValidationResult:
         """
@@ -50,9 +80,21 @@ class FeedbackLoop:
                 )
                 
         # Check expected outcomes
-        for step in plan.steps:
-            if step.executed and step.expected_outcome:
-                if not self._check_outcome(step.result, step.expected_outcome):
+        checks = [
+            (step, step.expected_outcome.lower())
+            for step in plan.steps if step.executed and step.expected_outcome
+        ]
+        if checks:
+            # One automaton holds every expected outcome; each distinct result
+            # object is stringified and scanned once
+            automaton = KeywordAutomaton(expected for _, expected in checks)
+            found_by_result = {}
+            for step, expected in checks:
+                found = found_by_result.get(id(step.result))
+                if found is None:
+                    found = self._check_outcomes(step.result, automaton)
+                    found_by_result[id(step.result)] = found
+                if expected not in found:
                     validation.add_warning(
                         f"Step '{step.action}' outcome differs from expected: {step.expected_outcome}"
                     )
@@ -71,22 +113,37 @@ class FeedbackLoop:
         Returns:
             Fixed plan
         """
+        # Deterministic error patterns on the same plan shape get the same fix
+        cache_key = (self._plan_signature(plan), self._error_signature(errors))
+        template = self._fix_cache.get(cache_key)
+        if template is not None:
+            self._fix_cache.move_to_end(cache_key)
+            return self._rebind_plan(template, plan)
+            
         # Clone the plan for modification
         fixed_plan = self._clone_plan(plan)
         
-        for error in errors:
-            # Find correction strategy
-            strategy = self._find_correction_strategy(error)
-            
+        # Find correction strategies, then look up documentation for all the
+        # remaining errors at once
+        strategies = [(error, self._find_correction_strategy(error)) for error in errors]
+        fixes = await self._query_documentation(
+            doc_rag,
+            [f"fix error: {error.message}" for error, strategy in strategies if not strategy]
+        )
+        
+        for error, strategy in strategies:
             if strategy:
                 # Apply the correction
                 await self._apply_correction(fixed_plan, error, strategy, doc_rag)
             else:
-                # Look up in documentation
-                fix_info = await doc_rag.query(f"fix error: {error.message}")
+                # Use the documentation lookup
+                fix_info = fixes[f"fix error: {error.message}"]
                 if fix_info:
                     await self._apply_documentation_fix(fixed_plan, error, fix_info)
                     
+        self._fix_cache[cache_key] = self._rebind_plan(fixed_plan, fixed_plan)
+        if len(self._fix_cache) > FIX_CACHE_SIZE:
+            self._fix_cache.popitem(last=False)
         return fixed_plan
         
     async def create_recovery_plan(self, plan: Any, exception: Exception, doc_rag: Any) -> Optional[Any]:
@@ -103,9 +160,10 @@ class FeedbackLoop:
         """
         error_msg = str(exception).lower()
         
-        # Check known error patterns
-        for pattern, recovery_func in self.error_patterns.items():
-            if re.search(pattern, error_msg):
+        # Check known error patterns with a single scan of the message
+        hits = self._error_automaton.find_all(error_msg)
+        for keywords, recovery_func in self._error_keywords:
+            if keywords_in_order(keywords, hits):
                 return await recovery_func(plan, exception, doc_rag)
                 
         # Generic recovery attempt
@@ -125,6 +183,7 @@ class FeedbackLoop:
             fix_pattern = self._extract_fix_pattern(feedback)
             if fix_pattern:
                 self.correction_strategies[fix_pattern['error']] = fix_pattern['fix']
+                self._strategy_automaton = None
                 
     def _initialize_error_patterns(self) -> Dict[str, Any]:
         """Initialize known error patterns and recovery functions"""
@@ -136,6 +195,23 @@ class FeedbackLoop:
             r'permission.*denied': self._recover_permission_error,
         }
         
+    def _compile_error_patterns(self, error_patterns: Dict[str, Any]):
+        """
+        Compile error patterns into ordered keyword lists and one automaton
+        
+        Patterns are literal keywords joined by '.*', so 'timeline.*not found'
+        matches when 'not found' occurs somewhere after 'timeline'.
+        """
+        error_keywords = []
+        automaton = KeywordAutomaton()
+        for pattern, recovery_func in error_patterns.items():
+            keywords = pattern.split('.*')
+            for keyword in keywords:
+                automaton.add(keyword)
+            error_keywords.append((keywords, recovery_func))
+        automaton.build()
+        return error_keywords, automaton
+        
     def _initialize_correction_strategies(self) -> Dict[str, Dict[str, Any]]:
         """Initialize correction strategies for known errors"""
         return {
@@ -155,23 +231,10 @@ class FeedbackLoop:
         
     async def _recover_connection_error(self, plan: Any, exception: Exception, doc_rag: Any) -> Any:
         """Recover from connection errors"""
-        from ..planner.plan import Plan, PlanStep, StepType
-        
         recovery_plan = Plan(summary="Recovery: Reconnect to DaVinci Resolve")
         
         # Add steps to check and restart Resolve if needed
-        recovery_plan.add_step(PlanStep(
-            step_type=StepType.VALIDATION,
-            action="check_resolve_running",
-            expected_outcome="DaVinci Resolve is running"
-        ))
-        
-        recovery_plan.add_step(PlanStep(
-            step_type=StepType.RESOLVE_API,
-            action="restart_app",
-            parameters={'wait_seconds': 10},
-            expected_outcome="DaVinci Resolve restarted"
-        ))
+        self._add_template_steps(recovery_plan, CONNECTION_RECOVERY_STEPS)
         
         # Then retry original plan
         for step in plan.steps:
@@ -182,23 +245,10 @@ class FeedbackLoop:
         
     async def _recover_no_project(self, plan: Any, exception: Exception, doc_rag: Any) -> Any:
         """Recover from no project open error"""
-        from ..planner.plan import Plan, PlanStep, StepType
-        
         recovery_plan = Plan(summary="Recovery: Open project")
         
         # Try to open the last project or create a new one
-        recovery_plan.add_step(PlanStep(
-            step_type=StepType.RESOLVE_API,
-            action="list_projects",
-            expected_outcome="Get available projects"
-        ))
-        
-        recovery_plan.add_step(PlanStep(
-            step_type=StepType.RESOLVE_API,
-            action="open_project",
-            parameters={'name': 'AutoRecovery'},  # This would be dynamic
-            expected_outcome="Project opened"
-        ))
+        self._add_template_steps(recovery_plan, NO_PROJECT_RECOVERY_STEPS)
         
         # Then continue with original plan
         for step in plan.steps:
@@ -209,25 +259,28 @@ class FeedbackLoop:
         
     async def _recover_timeline_not_found(self, plan: Any, exception: Exception, doc_rag: Any) -> Any:
         """Recover from timeline not found error"""
-        from ..planner.plan import Plan, PlanStep, StepType
-        
         recovery_plan = Plan(summary="Recovery: Create timeline")
         
         # Create a new timeline
-        recovery_plan.add_step(PlanStep(
-            step_type=StepType.RESOLVE_API,
-            action="create_empty_timeline",
-            parameters={'name': 'Recovery Timeline'},
-            expected_outcome="Timeline created"
-        ))
+        self._add_template_steps(recovery_plan, TIMELINE_RECOVERY_STEPS)
         
         # Continue with modified plan
         for step in plan.steps:
-            if not step.executed and 'timeline' not in step.action.lower():
+            if not step.executed and 'timeline' not in step.action_lc:
                 recovery_plan.add_step(step)
                 
         return recovery_plan
         
+    def _add_template_steps(self, plan: Any, templates: tuple):
+        """Add fresh steps built from (step_type, action, parameters, expected_outcome) templates"""
+        for step_type, action, parameters, expected_outcome in templates:
+            plan.add_step(PlanStep(
+                step_type=step_type,
+                action=action,
+                parameters=dict(parameters),
+                expected_outcome=expected_outcome
+            ))
+        
     async def _recover_media_not_found(self, plan: Any, exception: Exception, doc_rag: Any) -> Any:
         """Recover from media not found error"""
         # This would implement media recovery logic
@@ -251,32 +304,127 @@ class FeedbackLoop:
         return None
         
     def _clone_plan(self, plan: Any) -> Any:
-        """Create a deep copy of a plan"""
-        # This would implement proper plan cloning
-        # For now, return the original
-        return plan
+        """Create a structural copy of a plan"""
+        # Containers a fix may modify are copied; ids, enums, strings and
+        # step results are shared
+        return Plan(
+            task_id=plan.task_id,
+            summary=plan.summary,
+            steps=[
+                PlanStep(
+                    step_id=step.step_id,
+                    step_type=step.step_type,
+                    action=step.action,
+                    parameters=dict(step.parameters),
+                    dependencies=list(step.dependencies),
+                    expected_outcome=step.expected_outcome,
+                    validation_criteria=dict(step.validation_criteria),
+                    retry_count=step.retry_count,
+                    max_retries=step.max_retries,
+                    executed=step.executed,
+                    result=step.result,
+                    error=step.error
+                )
+                for step in plan.steps
+            ],
+            created_at=plan.created_at,
+            context=dict(plan.context),
+            completed_steps=list(plan.completed_steps),
+            failed_steps=list(plan.failed_steps)
+        )
+        
+    def _plan_signature(self, plan: Any) -> tuple:
+        """Get a hashable description of a plan's steps, parameters included"""
+        # Parameter values may be unhashable, so their repr stands in for them
+        return tuple(
+            (step.step_type, step.action, repr(sorted(step.parameters.items(), key=lambda item: item[0])))
+            for step in plan.steps
+        )
+        
+    def _error_signature(self, errors: List[ValidationError]) -> frozenset:
+        """Get a hashable description of a set of validation errors"""
+        return frozenset((error.error_type, error.message) for error in errors)
+        
+    def _rebind_plan(self, template: Any, plan: Any) -> Any:
+        """Copy a fixed plan template onto the identity of another plan, with fresh unexecuted steps"""
+        # New step ids, with dependencies remapped onto them
+        step_ids = {step.step_id: secrets.token_hex(8) for step in template.steps}
+        return Plan(
+            task_id=plan.task_id,
+            summary=template.summary,
+            steps=[
+                PlanStep(
+                    step_id=step_ids[step.step_id],
+                    step_type=step.step_type,
+                    action=step.action,
+                    parameters=dict(step.parameters),
+                    dependencies=[step_ids.get(dep, dep) for dep in step.dependencies],
+                    expected_outcome=step.expected_outcome,
+                    validation_criteria=dict(step.validation_criteria),
+                    max_retries=step.max_retries
+                )
+                for step in template.steps
+            ],
+            created_at=plan.created_at,
+            context=plan.context
+        )
         
     def _find_correction_strategy(self, error: ValidationError) -> Optional[Dict[str, Any]]:
         """Find correction strategy for an error"""
-        return self.correction_strategies.get(error.error_type)
+        strategy = self.correction_strategies.get(error.error_type)
+        if strategy is not None:
+            return strategy
+            
+        if self._strategy_automaton is None:
+            self._strategy_keys = {key.strip().lower(): key for key in self.correction_strategies}
+            self._strategy_automaton = KeywordAutomaton(self._strategy_keys)
+            
+        # Normalized exact match, or the longest known prefix of a
+        # parameterized type such as 'step_error:open_project'
+        error_type = error.error_type.strip().lower()
+        best = None
+        for start, key in self._strategy_automaton.iter(error_type):
+            if start == 0 and (len(key) == len(error_type) or error_type[len(key)] == ':'):
+                if best is None or len(key) > len(best):
+                    best = key
+                    
+        return self.correction_strategies.get(self._strategy_keys[best]) if best else None
         
     async def _apply_correction(self, plan: Any, error: ValidationError, strategy: Dict[str, Any], doc_rag: Any):
         """Apply a correction strategy to a plan"""
         if strategy['strategy'] == 'retry_with_modifications':
-            # Add validation steps before failed steps
-            for step in plan.steps:
+            # Add validation steps before failed steps; iterate over a snapshot
+            # since inserting shifts the positions of later steps
+            inserted = 0
+            for idx, step in enumerate(list(plan.steps)):
                 if step.error:
                     # Add prerequisite check
-                    self._add_validation_step(plan, step)
+                    self._add_validation_step(plan, step, idx + inserted)
+                    inserted += 1
                     
         elif strategy['strategy'] == 'fix_parameters':
             # Fix parameters based on error
-            for step in plan.steps:
-                if step.error and error.context.get('action') == step.action:
-                    # Look up correct parameters
-                    correct_params = await doc_rag.query(f"parameters for {step.action}")
-                    if correct_params:
-                        step.parameters.update(correct_params)
+            failed_steps = [
+                step for step in plan.steps
+                if step.error and error.context.get('action') == step.action
+            ]
+            
+            # Look up correct parameters
+            lookups = await self._query_documentation(
+                doc_rag, [f"parameters for {step.action}" for step in failed_steps]
+            )
+            for step in failed_steps:
+                correct_params = lookups[f"parameters for {step.action}"]
+                if correct_params:
+                    step.parameters.update(correct_params)
+                    
+    async def _query_documentation(self, doc_rag: Any, queries: List[str]) -> Dict[str, Any]:
+        """Run documentation queries concurrently, issuing each distinct query once"""
+        unique_queries = list(dict.fromkeys(queries))
+        if not unique_queries:
+            return {}
+        answers = await asyncio.gather(*(doc_rag.query(query) for query in unique_queries))
+        return dict(zip(unique_queries, answers))
                         
     async def _apply_documentation_fix(self, plan: Any, error: ValidationError, fix_info: str):
         """Apply fix from documentation"""
@@ -284,10 +432,8 @@ class FeedbackLoop:
         # This would be more sophisticated in practice
         pass
         
-    def _add_validation_step(self, plan: Any, before_step: Any):
+    def _add_validation_step(self, plan: Any, before_step: Any, idx: int):
         """Add a validation step before another step"""
-        from ..planner.plan import PlanStep, StepType
-        
         validation_step = PlanStep(
             step_type=StepType.VALIDATION,
             action="validate_prerequisites",
@@ -296,22 +442,21 @@ class FeedbackLoop:
         )
         
         # Insert before the target step
-        idx = plan.steps.index(before_step)
-        plan.steps.insert(idx, validation_step)
+        plan.insert_step(idx, validation_step)
         
         # Update dependencies
         before_step.dependencies.append(validation_step.step_id)
         
-    def _check_outcome(self, result: Any, expected: str) -> bool:
-        """Check if result matches expected outcome"""
+    def _check_outcomes(self, result: Any, automaton: KeywordAutomaton) -> set:
+        """Get the expected outcomes (lowercased) that a result matches"""
         # Simple string matching for now
         # Could be more sophisticated
-        return expected.lower() in str(result).lower()
+        return {outcome for _, outcome in automaton.iter(str(result).lower())}
         
     def _extract_fix_pattern(self, feedback: str) -> Optional[Dict[str, str]]:
         """Extract fix pattern from user feedback"""
         # Look for patterns like "should have done X instead of Y"
-        fix_match = re.search(r'should (?:have )?(.+) instead of (.+)', feedback, re.IGNORECASE)
+        fix_match = FIX_PATTERN.search(feedback)
         if fix_match:
             return {
                 'fix': fix_match.group(1),
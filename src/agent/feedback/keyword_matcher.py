@@ -0,0 +1,95 @@
+"""
+Multi-keyword matching for error and outcome dispatch
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that finds many literal keywords in a single pass"""
+
+    def __init__(self, keywords: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self._built = True
+        for keyword in keywords:
+            self.add(keyword)
+
+    def add(self, keyword: str):
+        """Add a keyword to the automaton"""
+        if not keyword:
+            return
+
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+
+        if keyword not in self._output[state]:
+            self._output[state].append(keyword)
+        self._built = False
+
+    def build(self):
+        """Compute failure links; called automatically before matching"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + [
+                    kw for kw in self._output[self._fail[next_state]]
+                    if kw not in self._output[next_state]
+                ]
+
+        self._built = True
+
+    def iter(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start_index, keyword) for every keyword occurrence in text"""
+        if not self._built:
+            self.build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in output[state]:
+                yield index - len(keyword) + 1, keyword
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """Map each keyword found in text to its sorted start positions"""
+        hits: Dict[str, List[int]] = {}
+        for start, keyword in self.iter(text):
+            hits.setdefault(keyword, []).append(start)
+        for starts in hits.values():
+            starts.sort()
+        return hits
+
+
+def keywords_in_order(keywords: List[str], hits: Dict[str, List[int]]) -> bool:
+    """Check that keywords occur in the given order without overlapping"""
+    position = 0
+    for keyword in keywords:
+        start = next((s for s in hits.get(keyword, ()) if s >= position), None)
+        if start is None:
+            return False
+        position = start + len(keyword)
+    return True
@@ -6,7 +6,7 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationError:
     """Represents a validation error"""
     error_type: str
@@ -23,7 +23,7 @@ class ValidationError:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     """Result of validating a plan execution"""
     is_valid: bool
@@ -4,15 +4,121 @@ Memory management for the DaVinci Resolve AI Agent
 
 import json
 import os
+import time
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from collections import deque
+from itertools import islice
 import sqlite3
+import threading
 from pathlib import Path
 
 import logging
 logger = logging.getLogger(__name__)
 
+def _json_default(obj: Any) -> Any:
+    """Encode numpy scalars/arrays and other non-JSON values"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, default=_json_default)
+        
+    _loads = json.loads
+
+# Long-term writes are queued and flushed by a background thread once this
+# many rows are pending or after FLUSH_INTERVAL seconds, whichever is first
+FLUSH_BATCH_SIZE = 64
+FLUSH_INTERVAL = 0.05
+
+# SQL statements are kept as constants so sqlite3's statement cache reuses
+# the compiled plans across calls
+CREATE_INTERACTIONS_SQL = """
+    CREATE TABLE IF NOT EXISTS interactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        metadata TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Older databases stored naive local-time ISO-8601 text (datetime.now()); the
+# 'utc' modifier shifts them to UTC before converting to epoch ns
+MIGRATE_TIMESTAMPS_SQL = """
+    INSERT INTO interactions (id, timestamp, type, content, metadata, created_at)
+    SELECT id,
+           CAST(round((julianday(timestamp, 'utc') - 2440587.5) * 86400000000000) AS INTEGER),
+           type, content, metadata, created_at
+    FROM interactions_old
+"""
+
+INSERT_INTERACTION_SQL = """
+    INSERT INTO interactions (timestamp, type, content, metadata)
+    VALUES (?, ?, ?, ?)
+"""
+
+SEARCH_INTERACTIONS_SQL = """
+    SELECT * FROM interactions 
+    WHERE content LIKE ? OR metadata LIKE ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+FTS_SEARCH_INTERACTIONS_SQL = """
+    SELECT i.* FROM interactions_fts f
+    JOIN interactions i ON i.id = f.rowid
+    WHERE interactions_fts MATCH ?
+    ORDER BY i.timestamp DESC
+    LIMIT ?
+"""
+
+SUCCESSFUL_PATTERNS_SQL = """
+    SELECT * FROM interactions 
+    WHERE type = 'feedback' 
+    AND {success} = 1
+    ORDER BY timestamp DESC
+    LIMIT 50
+"""
+
+ERROR_PATTERNS_SQL = """
+    SELECT * FROM interactions 
+    WHERE type IN ('error', 'feedback')
+    AND (type = 'error' OR {success} = 0)
+    ORDER BY timestamp DESC
+    LIMIT 50
+"""
+
+COUNT_INTERACTIONS_SQL = "SELECT COUNT(*) FROM interactions"
+
+COUNT_BY_TYPE_SQL = """
+    SELECT type, COUNT(*) as count 
+    FROM interactions 
+    GROUP BY type
+"""
+
+
+def _format_timestamp(timestamp_ns: int) -> str:
+    """Format an epoch-nanosecond timestamp as ISO-8601 (UTC)"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+
+
+def _with_iso_timestamp(interaction: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an interaction with its timestamp formatted for callers"""
+    return {**interaction, 'timestamp': _format_timestamp(interaction['timestamp'])}
+
 
 class MemoryManager:
     """Manages short-term and long-term memory for the agent"""
@@ -21,12 +127,26 @@ class MemoryManager:
         self.db_path = db_path or self._get_default_db_path()
         self.max_short_term = max_short_term
         self.short_term_memory = deque(maxlen=max_short_term)
+        self._conn = None
+        self._lock = threading.Lock()
+        self._fts_enabled = False
+        self._successful_patterns_sql = None
+        self._error_patterns_sql = None
         self._init_database()
         
+        # Background batching of long-term writes
+        self._write_queue = deque()
+        self._flush_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stop_flushing = False
+        self._flush_thread = threading.Thread(target=self._flush_loop, name="memory-flush", daemon=True)
+        self._flush_thread.start()
+        
     def add_interaction(self, content: Any, interaction_type: str, metadata: Optional[Dict[str, Any]] = None):
         """Add an interaction to memory"""
+        # Timestamps are kept as epoch nanoseconds and only formatted when read
         interaction = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': time.time_ns(),
             'type': interaction_type,
             'content': content,
             'metadata': metadata or {}
@@ -35,46 +155,51 @@ class MemoryManager:
         # Add to short-term memory
         self.short_term_memory.append(interaction)
         
-        # Store in long-term memory
-        self._store_long_term(interaction)
+        # Store in long-term memory, serializing content exactly once
+        try:
+            self._store_long_term(interaction, _dumps(interaction['content']), _dumps(interaction['metadata']))
+        except Exception as e:
+            logger.error(f"Error storing interaction: {e}")
         
     def get_recent_actions(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent actions from memory"""
-        recent = list(self.short_term_memory)[-limit:]
-        return [item for item in recent if item['type'] in ['action', 'command', 'response']]
+        recent = self._tail(limit)
+        return [_with_iso_timestamp(item) for item in recent if item['type'] in ('action', 'command', 'response')]
         
     def search_memory(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search through long-term memory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT * FROM interactions 
-                WHERE content LIKE ? OR metadata LIKE ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (f'%{query}%', f'%{query}%', limit))
-            
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'id': row['id'],
-                    'timestamp': row['timestamp'],
-                    'type': row['type'],
-                    'content': json.loads(row['content']),
-                    'metadata': json.loads(row['metadata'])
-                })
-                
-            return results
+        self.flush()
+        match_query = self._to_fts_query(query) if self._fts_enabled else None
+        with self._lock:
+            if match_query:
+                cursor = self._conn.execute(FTS_SEARCH_INTERACTIONS_SQL, (match_query, limit))
+            else:
+                cursor = self._conn.execute(SEARCH_INTERACTIONS_SQL, (f'%{query}%', f'%{query}%', limit))
+            rows = cursor.fetchall()
+            
+        results = []
+        for row in rows:
+            results.append({
+                'id': row['id'],
+                'timestamp': _format_timestamp(row['timestamp']),
+                'type': row['type'],
+                'content': _loads(row['content']),
+                'metadata': _loads(row['metadata'])
+            })
             
-        finally:
-            conn.close()
+        return results
             
     def get_context_window(self, window_size: int = 5) -> List[Dict[str, Any]]:
         """Get a context window of recent interactions"""
-        return list(self.short_term_memory)[-window_size:]
+        return [_with_iso_timestamp(item) for item in self._tail(window_size)]
+        
+    def _tail(self, count: int) -> List[Dict[str, Any]]:
+        """Get the last count short-term items, oldest first, without copying the whole deque"""
+        if count <= 0:
+            return []
+        tail = list(islice(reversed(self.short_term_memory), count))
+        tail.reverse()
+        return tail
         
     def store_feedback(self, task_id: str, feedback: str, success: bool):
         """Store user feedback about a task"""
@@ -89,61 +214,37 @@ class MemoryManager:
         
     def get_successful_patterns(self) -> List[Dict[str, Any]]:
         """Retrieve patterns from successful interactions"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT * FROM interactions 
-                WHERE type = 'feedback' 
-                AND json_extract(content, '$.success') = 1
-                ORDER BY timestamp DESC
-                LIMIT 50
-            """)
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(self._successful_patterns_sql).fetchall()
             
-            patterns = []
-            for row in cursor.fetchall():
-                content = json.loads(row['content'])
-                patterns.append({
-                    'task_id': content.get('task_id'),
-                    'feedback': content.get('feedback'),
-                    'timestamp': row['timestamp']
-                })
-                
-            return patterns
+        patterns = []
+        for row in rows:
+            content = _loads(row['content'])
+            patterns.append({
+                'task_id': content.get('task_id'),
+                'feedback': content.get('feedback'),
+                'timestamp': _format_timestamp(row['timestamp'])
+            })
             
-        finally:
-            conn.close()
+        return patterns
             
     def get_error_patterns(self) -> List[Dict[str, Any]]:
         """Retrieve patterns from failed interactions"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT * FROM interactions 
-                WHERE type IN ('error', 'feedback')
-                AND (type = 'error' OR json_extract(content, '$.success') = 0)
-                ORDER BY timestamp DESC
-                LIMIT 50
-            """)
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(self._error_patterns_sql).fetchall()
             
-            patterns = []
-            for row in cursor.fetchall():
-                content = json.loads(row['content'])
-                patterns.append({
-                    'type': row['type'],
-                    'content': content,
-                    'timestamp': row['timestamp']
-                })
-                
-            return patterns
+        patterns = []
+        for row in rows:
+            content = _loads(row['content'])
+            patterns.append({
+                'type': row['type'],
+                'content': content,
+                'timestamp': _format_timestamp(row['timestamp'])
+            })
             
-        finally:
-            conn.close()
+        return patterns
             
     def clear_short_term_memory(self):
         """Clear short-term memory"""
@@ -151,8 +252,10 @@ class MemoryManager:
         
     def export_memory(self, export_path: str):
         """Export memory to file"""
+        self.flush()
+        
         memory_data = {
-            'short_term': list(self.short_term_memory),
+            'short_term': [_with_iso_timestamp(item) for item in self.short_term_memory],
             'export_date': datetime.now().isoformat()
         }
         
@@ -172,87 +275,200 @@ class MemoryManager:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
             
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # One connection is kept for the lifetime of the manager; autocommit
+        # mode lets writes manage their own transactions
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA mmap_size=268435456")
         
-        try:
+        with self._lock:
             # Create interactions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS interactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+            self._conn.execute(CREATE_INTERACTIONS_SQL)
+            self._migrate_timestamps()
             
             # Create indices
-            cursor.execute("""
+            self._conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_timestamp 
                 ON interactions(timestamp DESC)
             """)
             
-            cursor.execute("""
+            self._conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_type 
                 ON interactions(type)
             """)
             
-            conn.commit()
+            # Feedback success flag as an indexed generated column, so the
+            # pattern queries avoid parsing JSON for every row
+            success = "success" if self._init_success_column() else "json_extract(content, '$.success')"
+            self._successful_patterns_sql = SUCCESSFUL_PATTERNS_SQL.format(success=success)
+            self._error_patterns_sql = ERROR_PATTERNS_SQL.format(success=success)
             
-        finally:
-            conn.close()
+            self._fts_enabled = self._init_fts()
             
-    def _store_long_term(self, interaction: Dict[str, Any]):
-        """Store interaction in long-term memory"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def _migrate_timestamps(self):
+        """Rebuild a table created with TEXT timestamps to use INTEGER epoch ns"""
+        columns = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(interactions)")}
+        if columns.get('timestamp', '').upper() != 'TEXT':
+            return
+            
+        logger.info("Migrating interaction timestamps to epoch nanoseconds")
+        self._conn.execute("BEGIN IMMEDIATE")
         try:
-            cursor.execute("""
-                INSERT INTO interactions (timestamp, type, content, metadata)
-                VALUES (?, ?, ?, ?)
-            """, (
-                interaction['timestamp'],
-                interaction['type'],
-                json.dumps(interaction['content']),
-                json.dumps(interaction['metadata'])
-            ))
-            
-            conn.commit()
+            # Renaming carries the old indices and triggers along, so they are
+            # dropped with the old table and recreated afterwards
+            self._conn.execute("ALTER TABLE interactions RENAME TO interactions_old")
+            self._conn.execute(CREATE_INTERACTIONS_SQL)
+            self._conn.execute(MIGRATE_TIMESTAMPS_SQL)
+            self._conn.execute("DROP TABLE interactions_old")
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
             
-        except Exception as e:
-            logger.error(f"Error storing interaction: {e}")
+    def _init_success_column(self) -> bool:
+        """Add the generated success column and its index if missing"""
+        try:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_xinfo(interactions)")}
+            if 'success' not in columns:
+                self._conn.execute("""
+                    ALTER TABLE interactions ADD COLUMN success INTEGER
+                    GENERATED ALWAYS AS (json_extract(content, '$.success')) VIRTUAL
+                """)
+                
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_type_success_ts 
+                ON interactions(type, success, timestamp DESC)
+            """)
+            return True
             
-        finally:
-            conn.close()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Generated columns not available, pattern queries will parse JSON: {e}")
+            return False
             
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get memory statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def _init_fts(self) -> bool:
+        """Create the full-text index over interactions, kept in sync by triggers"""
         try:
-            # Total interactions
-            cursor.execute("SELECT COUNT(*) FROM interactions")
-            total_interactions = cursor.fetchone()[0]
+            exists = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'interactions_fts'"
+            ).fetchone()
             
-            # Interactions by type
-            cursor.execute("""
-                SELECT type, COUNT(*) as count 
-                FROM interactions 
-                GROUP BY type
+            self._conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+                    content, metadata,
+                    content='interactions', content_rowid='id', tokenize='unicode61'
+                )
+            """)
+            
+            self._conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS interactions_fts_insert AFTER INSERT ON interactions BEGIN
+                    INSERT INTO interactions_fts(rowid, content, metadata)
+                    VALUES (new.id, new.content, new.metadata);
+                END
+            """)
+            
+            self._conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS interactions_fts_delete AFTER DELETE ON interactions BEGIN
+                    INSERT INTO interactions_fts(interactions_fts, rowid, content, metadata)
+                    VALUES ('delete', old.id, old.content, old.metadata);
+                END
+            """)
+            
+            self._conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS interactions_fts_update AFTER UPDATE ON interactions BEGIN
+                    INSERT INTO interactions_fts(interactions_fts, rowid, content, metadata)
+                    VALUES ('delete', old.id, old.content, old.metadata);
+                    INSERT INTO interactions_fts(rowid, content, metadata)
+                    VALUES (new.id, new.content, new.metadata);
+                END
             """)
             
-            type_counts = {row[0]: row[1] for row in cursor.fetchall()}
+            # Index rows written before the full-text table existed
+            if not exists:
+                self._conn.execute("INSERT INTO interactions_fts(interactions_fts) VALUES ('rebuild')")
+                
+            return True
+            
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 not available, memory search will use LIKE: {e}")
+            return False
             
-            return {
-                'total_interactions': total_interactions,
-                'short_term_size': len(self.short_term_memory),
-                'interactions_by_type': type_counts,
-                'database_path': self.db_path
-            }
+    def _to_fts_query(self, query: str) -> Optional[str]:
+        """Translate a free-text query into an FTS5 prefix query on every token"""
+        tokens = query.split()
+        if not tokens:
+            return None
+        return " ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
             
-        finally:
-            conn.close()
\ No newline at end of file
+    def _store_long_term(self, interaction: Dict[str, Any], content_json: str, metadata_json: str):
+        """Queue an interaction for the background writer"""
+        self._write_queue.append((
+            interaction['timestamp'],
+            interaction['type'],
+            content_json,
+            metadata_json
+        ))
+        
+        if len(self._write_queue) >= FLUSH_BATCH_SIZE:
+            self._flush_event.set()
+            
+    def _flush_loop(self):
+        """Background thread that periodically drains the write queue"""
+        while not self._stop_flushing:
+            self._flush_event.wait(timeout=FLUSH_INTERVAL)
+            self._flush_event.clear()
+            self.flush()
+            
+    def flush(self):
+        """Write all queued interactions to the database"""
+        with self._flush_lock:
+            batch = []
+            while self._write_queue:
+                batch.append(self._write_queue.popleft())
+                
+            if batch and self._conn is not None:
+                self._store_many(batch)
+        
+    def _store_many(self, rows: List[tuple]):
+        """Insert interaction rows in a single transaction"""
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(INSERT_INTERACTION_SQL, rows)
+                self._conn.execute("COMMIT")
+                
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.error(f"Error storing interaction: {e}")
+            
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get memory statistics"""
+        self.flush()
+        with self._lock:
+            # Total interactions
+            total_interactions = self._conn.execute(COUNT_INTERACTIONS_SQL).fetchone()[0]
+            
+            # Interactions by type
+            type_counts = {row[0]: row[1] for row in self._conn.execute(COUNT_BY_TYPE_SQL).fetchall()}
+            
+        return {
+            'total_interactions': total_interactions,
+            'short_term_size': len(self.short_term_memory),
+            'interactions_by_type': type_counts,
+            'database_path': self.db_path
+        }
+        
+    def close(self):
+        """Flush pending writes and close the database connection"""
+        self._stop_flushing = True
+        self._flush_event.set()
+        self._flush_thread.join()
+        self.flush()
+        
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,6 +1,6 @@
 """Task planning module for DaVinci Resolve AI Agent"""
 
-from .task_planner import TaskPlanner
+from .task_planner import TaskPlanner, get_planner
 from .plan import Plan, PlanStep
 
-__all__ = ['TaskPlanner', 'Plan', 'PlanStep']
\ No newline at end of file
+__all__ = ['TaskPlanner', 'get_planner', 'Plan', 'PlanStep']
\ No newline at end of file
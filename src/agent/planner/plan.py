@@ -2,10 +2,11 @@
 Plan representation for task execution
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Iterable
 from dataclasses import dataclass, field
 from datetime import datetime
 import uuid
+import secrets
 from enum import Enum
 
 
@@ -18,10 +19,14 @@ class StepType(Enum):
     COMPOSITE = "composite"
 
 
-@dataclass
+# Plain string value per step type, so serialization skips the enum descriptor
+STEP_TYPE_VALUES = {step_type: step_type.value for step_type in StepType}
+
+
+@dataclass(slots=True)
 class PlanStep:
     """Represents a single step in a plan"""
-    step_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    step_id: str = field(default_factory=lambda: secrets.token_hex(8))  # in-process id
     step_type: StepType = StepType.RESOLVE_API
     action: str = ""
     parameters: Dict[str, Any] = field(default_factory=dict)
@@ -34,15 +39,29 @@ class PlanStep:
     result: Optional[Any] = None
     error: Optional[str] = None
     
-    def can_execute(self, completed_steps: List[str]) -> bool:
+    # Lowercased action, cached together with the action string it came from
+    _action_lc: str = field(default="", init=False, repr=False, compare=False)
+    _action_lc_source: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def action_lc(self) -> str:
+        """Lowercased action, recomputed only when action is reassigned"""
+        if self._action_lc_source is not self.action:
+            self._action_lc = self.action.lower()
+            self._action_lc_source = self.action
+        return self._action_lc
+    
+    def can_execute(self, completed_steps: Iterable[str]) -> bool:
         """Check if this step can be executed based on dependencies"""
-        return all(dep in completed_steps for dep in self.dependencies)
+        if not isinstance(completed_steps, (set, frozenset)):
+            completed_steps = set(completed_steps)
+        return completed_steps.issuperset(self.dependencies)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return {
             'step_id': self.step_id,
-            'step_type': self.step_type.value,
+            'step_type': STEP_TYPE_VALUES[self.step_type],
             'action': self.action,
             'parameters': self.parameters,
             'dependencies': self.dependencies,
@@ -54,7 +73,7 @@ class PlanStep:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Plan:
     """Represents a complete execution plan"""
     task_id: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -65,36 +84,99 @@ class Plan:
     completed_steps: List[str] = field(default_factory=list)
     failed_steps: List[str] = field(default_factory=list)
     
+    # Lookup indices; the lists above keep insertion order for serialization.
+    # Populated by __post_init__, so no default containers are allocated
+    _by_id: Dict[str, PlanStep] = field(default=None, init=False, repr=False, compare=False)
+    _completed_set: Set[str] = field(default=None, init=False, repr=False, compare=False)
+    _failed_set: Set[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Scheduling state (Kahn's algorithm): unmet dependency counts, reverse
+    # edges and the steps currently ready to run. Only created by
+    # _build_schedule, on the first get_next_steps after steps change
+    _pending: Optional[Dict[str, int]] = field(default=None, init=False, repr=False, compare=False)
+    _dependents: Optional[Dict[str, List[str]]] = field(default=None, init=False, repr=False, compare=False)
+    _ready: Optional[Dict[str, PlanStep]] = field(default=None, init=False, repr=False, compare=False)
+    _schedule_dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._by_id = {step.step_id: step for step in self.steps}
+        self._completed_set = set(self.completed_steps)
+        self._failed_set = set(self.failed_steps)
+    
     def add_step(self, step: PlanStep):
         """Add a step to the plan"""
         self.steps.append(step)
+        self._by_id[step.step_id] = step
+        self._schedule_dirty = True
+        
+    def insert_step(self, index: int, step: PlanStep):
+        """Insert a step at a position in the plan"""
+        self.steps.insert(index, step)
+        self._by_id[step.step_id] = step
+        self._schedule_dirty = True
+        
+    def get_step(self, step_id: str) -> Optional[PlanStep]:
+        """Get a step by its ID"""
+        return self._by_id.get(step_id)
         
     def get_next_steps(self) -> List[PlanStep]:
         """Get the next steps that can be executed"""
-        return [
-            step for step in self.steps
-            if not step.executed and step.can_execute(self.completed_steps)
-        ]
+        if self._schedule_dirty:
+            self._build_schedule()
+        return [step for step in self._ready.values() if not step.executed]
+        
+    def _build_schedule(self):
+        """Build dependency counters and the ready set from the current steps"""
+        self._pending = {}
+        self._dependents = {}
+        self._ready = {}
+        
+        for step in self.steps:
+            if step.executed:
+                continue
+            missing = [dep for dep in step.dependencies if dep not in self._completed_set]
+            self._pending[step.step_id] = len(missing)
+            for dep in missing:
+                self._dependents.setdefault(dep, []).append(step.step_id)
+            if not missing:
+                self._ready[step.step_id] = step
+                
+        self._schedule_dirty = False
         
     def mark_step_complete(self, step_id: str, result: Any = None):
         """Mark a step as completed"""
-        for step in self.steps:
-            if step.step_id == step_id:
-                step.executed = True
-                step.result = result
-                if step_id not in self.completed_steps:
-                    self.completed_steps.append(step_id)
-                break
+        step = self._by_id.get(step_id)
+        if step is None:
+            return
+        step.executed = True
+        step.result = result
+        if step_id not in self._completed_set:
+            self._completed_set.add(step_id)
+            self.completed_steps.append(step_id)
+            
+            # Release steps whose last unmet dependency was this one
+            if not self._schedule_dirty:
+                self._ready.pop(step_id, None)
+                for dependent_id in self._dependents.pop(step_id, ()):
+                    self._pending[dependent_id] -= 1
+                    if self._pending[dependent_id] == 0:
+                        self._ready[dependent_id] = self._by_id[dependent_id]
+                
+    def mark_batch(self, results: Dict[str, Any]):
+        """Mark several steps as completed in one call"""
+        for step_id, result in results.items():
+            self.mark_step_complete(step_id, result)
                 
     def mark_step_failed(self, step_id: str, error: str):
         """Mark a step as failed"""
-        for step in self.steps:
-            if step.step_id == step_id:
-                step.error = error
-                step.retry_count += 1
-                if step_id not in self.failed_steps:
-                    self.failed_steps.append(step_id)
-                break
+        step = self._by_id.get(step_id)
+        if step is None:
+            return
+        step.error = error
+        step.retry_count += 1
+        if step_id not in self._failed_set:
+            self._failed_set.add(step_id)
+            self.failed_steps.append(step_id)
                 
     def get_executed_actions(self) -> List[Dict[str, Any]]:
         """Get list of executed actions with their results"""
@@ -112,6 +194,10 @@ class Plan:
         """Check if the plan is complete"""
         return all(step.executed for step in self.steps)
         
+    def needs_validation(self) -> bool:
+        """Check if any step declares validation criteria"""
+        return any(step.validation_criteria for step in self.steps)
+        
     def get_progress(self) -> float:
         """Get plan progress as percentage"""
         if not self.steps:
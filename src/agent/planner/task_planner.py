@@ -4,17 +4,45 @@ Task planner that converts user requests into executable plans
 
 import re
 import logging
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from .plan import Plan, PlanStep, StepType
 
 logger = logging.getLogger(__name__)
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Entity extraction patterns
+QUOTED_NAME_PATTERN = re.compile(r'"([^"]+)"')
+RESOLUTION_PATTERN = re.compile(r'(\d+)x(\d+)')
+FRAME_RATE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*fps', re.IGNORECASE)
+QUOTED_PATH_PATTERN = re.compile(r'["\']([^"\']+)["\']')
+LUT_PATTERN = re.compile(r'lut["\s]+([^"\s]+)', re.IGNORECASE)
+
+# Intents whose planning needs a documentation lookup
+DOC_INTENTS = frozenset({'composite_effect', 'generic', 'complex_workflow'})
+
 
 class TaskPlanner:
     """Plans tasks based on user requests and context"""
     
     def __init__(self):
         self.action_patterns = self._initialize_action_patterns()
+        self._intent_re, self._pattern_intents = self._combine_action_patterns(self.action_patterns)
+        self._hs_db, self._hs_scratch, self._hs_intents = self._compile_hyperscan(self.action_patterns)
+        
+        # Intent -> planning handler; anything else falls back to generic planning
+        self._intent_handlers = {
+            'create_timeline': self._plan_create_timeline,
+            'import_media': self._plan_import_media,
+            'color_grade': self._plan_color_grade,
+            'export_video': self._plan_export_video,
+            'analyze_video': self._plan_analyze_video,
+            'composite_effect': self._plan_composite_effect
+        }
         
     async def create_plan(self, user_request: str, context: Any, doc_rag: Any) -> Plan:
         """
@@ -29,7 +57,7 @@ class TaskPlanner:
         intent, entities = await self._analyze_request(user_request)
         
         # Get relevant documentation if needed
-        if self._needs_documentation(intent):
+        if intent in DOC_INTENTS:
             docs = await doc_rag.query(intent)
         else:
             docs = None
@@ -39,18 +67,9 @@ class TaskPlanner:
         plan.context = context.get_full_context()
         
         # Build steps based on intent
-        if intent == "create_timeline":
-            await self._plan_create_timeline(plan, entities)
-        elif intent == "import_media":
-            await self._plan_import_media(plan, entities)
-        elif intent == "color_grade":
-            await self._plan_color_grade(plan, entities)
-        elif intent == "export_video":
-            await self._plan_export_video(plan, entities)
-        elif intent == "analyze_video":
-            await self._plan_analyze_video(plan, entities)
-        elif intent == "composite_effect":
-            await self._plan_composite_effect(plan, entities, docs)
+        handler = self._intent_handlers.get(intent)
+        if handler is not None:
+            await handler(plan, entities, docs)
         else:
             # Generic planning based on action patterns
             await self._plan_generic(plan, user_request, context)
@@ -70,25 +89,24 @@ class TaskPlanner:
             suggestions.append("Create a timeline to begin editing")
         elif not current_state.get('media_pool_has_clips'):
             suggestions.append("Import media files to the media pool")
-        else:
+        elif recent_actions:
             # Suggest based on recent actions
-            last_action = recent_actions[0] if recent_actions else None
-            if last_action:
-                if 'import' in last_action.get('action', ''):
-                    suggestions.append("Add imported clips to timeline")
-                    suggestions.append("Create proxies for better performance")
-                elif 'timeline' in last_action.get('action', ''):
-                    suggestions.append("Apply color grading")
-                    suggestions.append("Add transitions between clips")
-                elif 'color' in last_action.get('action', ''):
-                    suggestions.append("Export the graded timeline")
-                    suggestions.append("Save color preset for future use")
-                    
+            action = recent_actions[0].get('action', '')
+            if 'import' in action:
+                suggestions.append("Add imported clips to timeline")
+                suggestions.append("Create proxies for better performance")
+            elif 'timeline' in action:
+                suggestions.append("Apply color grading")
+                suggestions.append("Add transitions between clips")
+            elif 'color' in action:
+                suggestions.append("Export the graded timeline")
+                suggestions.append("Save color preset for future use")
+                
         return suggestions
         
-    def _initialize_action_patterns(self) -> Dict[str, List[Tuple[str, str]]]:
+    def _initialize_action_patterns(self) -> Dict[str, List[Tuple[re.Pattern, str]]]:
         """Initialize patterns for detecting actions in requests"""
-        return {
+        patterns = {
             'create_timeline': [
                 (r'create.*timeline', 'create_timeline'),
                 (r'new timeline', 'create_timeline'),
@@ -120,17 +138,89 @@ class TaskPlanner:
             ]
         }
         
-    async def _analyze_request(self, request: str) -> Tuple[str, Dict[str, Any]]:
-        """Analyze user request to extract intent and entities"""
-        request_lower = request.lower()
+        # Compile once; matching is case-insensitive so requests need no lowering
+        return {
+            intent: [(re.compile(pattern, re.IGNORECASE), action) for pattern, action in intent_patterns]
+            for intent, intent_patterns in patterns.items()
+        }
+        
+    def _combine_action_patterns(self, action_patterns: Dict[str, List[Tuple[re.Pattern, str]]]) -> Tuple[re.Pattern, List[str]]:
+        """
+        Merge all action patterns into a single alternation
         
-        # Check action patterns
-        for intent, patterns in self.action_patterns.items():
+        Each alternative is a zero-width lookahead, so scanning the request
+        once with finditer reports, at every position where something
+        matches, the earliest pattern (in intent order) matching there.
+        """
+        alternatives = []
+        intents = []
+        for intent, patterns in action_patterns.items():
+            for pattern, action in patterns:
+                alternatives.append(f"(?=(?P<g{len(alternatives)}>{pattern.pattern}))")
+                intents.append(intent)
+                
+        combined = re.compile("|".join(alternatives) or "(?!)", re.IGNORECASE)
+        return combined, intents
+        
+    def _compile_hyperscan(self, action_patterns: Dict[str, List[Tuple[re.Pattern, str]]]) -> Tuple[Any, Any, List[str]]:
+        """Compile all action patterns into one Hyperscan database, if available"""
+        if hyperscan is None:
+            return None, None, []
+            
+        expressions = []
+        intents = []
+        for intent, patterns in action_patterns.items():
             for pattern, action in patterns:
-                if re.search(pattern, request_lower):
-                    # Extract entities based on intent
-                    entities = await self._extract_entities(request, intent)
-                    return intent, entities
+                expressions.append(pattern.pattern.encode())
+                intents.append(intent)
+                
+        if not expressions:
+            return None, None, []
+            
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+            )
+            return db, hyperscan.Scratch(db), intents
+        except Exception as e:
+            logger.warning(f"Hyperscan unavailable, using re for intent matching: {e}")
+            return None, None, []
+            
+    def _match_intent(self, request: str) -> Optional[str]:
+        """Get the intent of the first action pattern that matches the request"""
+        if self._hs_db is not None and request.isascii():
+            # Matches arrive by end offset, so keep the lowest pattern id
+            matched = []
+            self._hs_db.scan(
+                request.encode(),
+                match_event_handler=lambda pattern_id, start, end, flags, context: matched.append(pattern_id),
+                scratch=self._hs_scratch
+            )
+            return self._hs_intents[min(matched)] if matched else None
+            
+        # One left-to-right pass; the first pattern in intent order still wins
+        # over one that matches earlier in the request
+        best = None
+        for match in self._intent_re.finditer(request):
+            index = int(match.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return self._pattern_intents[best] if best is not None else None
+        
+    async def _analyze_request(self, request: str) -> Tuple[str, Dict[str, Any]]:
+        """Analyze user request to extract intent and entities"""
+        # Check all action patterns in a single scan
+        intent = self._match_intent(request)
+        if intent:
+            # Extract entities based on intent
+            entities = await self._extract_entities(request, intent)
+            return intent, entities
                     
         # Default to generic intent
         return 'generic', {'request': request}
@@ -141,40 +231,36 @@ class TaskPlanner:
         
         if intent == 'create_timeline':
             # Extract timeline name
-            match = re.search(r'"([^"]+)"', request)
+            match = QUOTED_NAME_PATTERN.search(request)
             if match:
                 entities['name'] = match.group(1)
                 
             # Extract resolution
-            res_match = re.search(r'(\d+)x(\d+)', request)
+            res_match = RESOLUTION_PATTERN.search(request)
             if res_match:
                 entities['width'] = int(res_match.group(1))
                 entities['height'] = int(res_match.group(2))
                 
             # Extract frame rate
-            fps_match = re.search(r'(\d+(?:\.\d+)?)\s*fps', request.lower())
+            fps_match = FRAME_RATE_PATTERN.search(request)
             if fps_match:
                 entities['frame_rate'] = float(fps_match.group(1))
                 
         elif intent == 'import_media':
             # Extract file paths
-            path_matches = re.findall(r'["\']([^"\']+)["\']', request)
+            path_matches = QUOTED_PATH_PATTERN.findall(request)
             if path_matches:
                 entities['paths'] = path_matches
                 
         elif intent == 'color_grade':
             # Extract LUT path if mentioned
-            lut_match = re.search(r'lut["\s]+([^"\s]+)', request.lower())
+            lut_match = LUT_PATTERN.search(request)
             if lut_match:
                 entities['lut_path'] = lut_match.group(1)
                 
         return entities
         
-    def _needs_documentation(self, intent: str) -> bool:
-        """Check if documentation lookup is needed for this intent"""
-        return intent in ['composite_effect', 'generic', 'complex_workflow']
-        
-    async def _plan_create_timeline(self, plan: Plan, entities: Dict[str, Any]):
+    async def _plan_create_timeline(self, plan: Plan, entities: Dict[str, Any], docs: Optional[str]):
         """Plan timeline creation"""
         step = PlanStep(
             step_type=StepType.RESOLVE_API,
@@ -184,20 +270,29 @@ class TaskPlanner:
         )
         plan.add_step(step)
         
-    async def _plan_import_media(self, plan: Plan, entities: Dict[str, Any]):
+    async def _plan_import_media(self, plan: Plan, entities: Dict[str, Any], docs: Optional[str]):
         """Plan media import"""
         paths = entities.get('paths', [])
         
-        for path in paths:
+        if len(paths) == 1:
             step = PlanStep(
                 step_type=StepType.RESOLVE_API,
                 action="import_media",
-                parameters={'file_path': path},
-                expected_outcome=f"Media imported: {path}"
+                parameters={'file_path': paths[0]},
+                expected_outcome=f"Media imported: {paths[0]}"
+            )
+            plan.add_step(step)
+        elif paths:
+            # The media pool imports a whole list in one API call
+            step = PlanStep(
+                step_type=StepType.RESOLVE_API,
+                action="import_media_batch",
+                parameters={'file_paths': paths},
+                expected_outcome=f"Imported {len(paths)} media files"
             )
             plan.add_step(step)
             
-    async def _plan_color_grade(self, plan: Plan, entities: Dict[str, Any]):
+    async def _plan_color_grade(self, plan: Plan, entities: Dict[str, Any], docs: Optional[str]):
         """Plan color grading operations"""
         if 'lut_path' in entities:
             step = PlanStep(
@@ -217,7 +312,7 @@ class TaskPlanner:
             )
             plan.add_step(step)
             
-    async def _plan_export_video(self, plan: Plan, entities: Dict[str, Any]):
+    async def _plan_export_video(self, plan: Plan, entities: Dict[str, Any], docs: Optional[str]):
         """Plan video export"""
         # Add to render queue
         step1 = PlanStep(
@@ -238,7 +333,7 @@ class TaskPlanner:
         )
         plan.add_step(step2)
         
-    async def _plan_analyze_video(self, plan: Plan, entities: Dict[str, Any]):
+    async def _plan_analyze_video(self, plan: Plan, entities: Dict[str, Any], docs: Optional[str]):
         """Plan video analysis"""
         step = PlanStep(
             step_type=StepType.VIDEO_ANALYSIS,
@@ -273,4 +368,18 @@ class TaskPlanner:
             parameters={'query': request},
             expected_outcome="Found relevant commands"
         )
-        plan.add_step(step)
\ No newline at end of file
+        plan.add_step(step)
+
+
+_planner = None
+_planner_lock = threading.Lock()
+
+
+def get_planner() -> TaskPlanner:
+    """Get the process-wide TaskPlanner, creating it on first use"""
+    global _planner
+    if _planner is None:
+        with _planner_lock:
+            if _planner is None:
+                _planner = TaskPlanner()
+    return _planner
\ No newline at end of file
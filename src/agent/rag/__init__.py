@@ -1,5 +1,5 @@
 """RAG module for DaVinci Resolve documentation"""
 
-from .resolve_doc_rag import ResolveDocRAG
+from .resolve_doc_rag import ResolveDocRAG, get_doc_rag
 
-__all__ = ['ResolveDocRAG']
\ No newline at end of file
+__all__ = ['ResolveDocRAG', 'get_doc_rag']
\ No newline at end of file
@@ -3,14 +3,67 @@ RAG system for DaVinci Resolve documentation
 """
 
 import os
+import re
 import json
+import math
+import bisect
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# File reads release the GIL, so a few threads overlap the I/O
+DOC_LOAD_WORKERS = 8
+
+# Terms are runs of two or more word characters (TfidfVectorizer's default);
+# the prefilter and retrieval share it so they agree on what can be scored
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Separates titles in the title index; never part of a title or command
+TITLE_SEPARATOR = '\x00'
+
+# Planner lookups repeat a small set of queries
+QUERY_CACHE_SIZE = 256
+
+
+class TermBloomFilter:
+    """Bloom filter over the terms indexed by the documentation corpus"""
+    
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        
+    def _positions(self, term: str):
+        # Double hashing: k positions derived from two independent hashes
+        h1 = hash(term)
+        h2 = hash((term, 0x9E3779B9)) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size
+            
+    def add(self, term: str):
+        """Add a term to the filter"""
+        for pos in self._positions(term):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+            
+    def __contains__(self, term: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(term))
+
+
 
 class ResolveDocRAG:
     """RAG system for querying DaVinci Resolve documentation"""
@@ -20,6 +73,12 @@ class ResolveDocRAG:
         self.documents = {}
         self.embeddings = {}
         self.index = None
+        self.term_filter = None
+        self._title_text = ''
+        self._title_starts = []
+        self._title_ids = []
+        self._sentences = {}
+        self._embeddings_built = False
         self._load_documentation()
         
     async def query(self, question: str, k: int = 5) -> str:
@@ -44,16 +103,17 @@ class ResolveDocRAG:
     async def get_command_info(self, command: str) -> Dict[str, Any]:
         """Get detailed information about a specific command"""
         # Search for exact command match
-        for doc_id, doc in self.documents.items():
-            if command.lower() in doc.get('title', '').lower():
-                return {
-                    'command': command,
-                    'description': doc.get('content', ''),
-                    'parameters': doc.get('parameters', []),
-                    'examples': doc.get('examples', []),
-                    'related': doc.get('related', [])
-                }
-                
+        doc_id = self._find_title(command.lower())
+        if doc_id is not None:
+            doc = self.documents[doc_id]
+            return {
+                'command': command,
+                'description': doc.get('content', ''),
+                'parameters': doc.get('parameters', []),
+                'examples': doc.get('examples', []),
+                'related': doc.get('related', [])
+            }
+            
         # If no exact match, do similarity search
         results = await self.query(f"How to use {command}?")
         return {
@@ -63,6 +123,17 @@ class ResolveDocRAG:
             'examples': []
         }
         
+    def covers(self, topic: str) -> bool:
+        """
+        Check whether the corpus may cover a topic
+        
+        False means no term of the topic is indexed, so a query is
+        guaranteed to find nothing relevant. True may be a false positive.
+        """
+        if self.term_filter is None:
+            return True
+        return any(term in self.term_filter for term in TOKEN_PATTERN.findall(topic.lower()))
+        
     def _get_default_docs_path(self) -> str:
         """Get default documentation path"""
         return os.path.join(os.path.dirname(__file__), '..', '..', '..', 'docs', 'resolve_api')
@@ -76,8 +147,13 @@ class ResolveDocRAG:
         if os.path.exists(self.docs_path):
             self._load_docs_from_files()
             
-        # Create embeddings for semantic search
-        self._create_embeddings()
+        # Index corpus terms for cheap negative lookups
+        self._build_term_filter()
+        
+        # Index lowercased titles and split sentences for lookups and answers
+        self._build_document_index()
+        
+        # Embeddings for semantic search are built on first retrieval
         
     def _load_builtin_docs(self):
         """Load built-in documentation"""
@@ -148,6 +224,7 @@ class ResolveDocRAG:
             'content': '''
             Media pool operations:
             - Import media: import_media(file_path) imports files to media pool
+            - Import many files: import_media_batch(file_paths) imports a list in one call
             - Create bins: create_bin(name) creates organizational bins
             - List clips: list_media_pool_clips() returns all clips
             - Delete media: delete_media(clip_name) removes clips
@@ -199,57 +276,175 @@ class ResolveDocRAG:
         """Load documentation from files"""
         try:
             docs_dir = Path(self.docs_path)
-            for doc_file in docs_dir.glob("*.json"):
-                with open(doc_file, 'r') as f:
-                    doc_data = json.load(f)
-                    doc_id = doc_file.stem
-                    self.documents[doc_id] = doc_data
+            doc_files = list(docs_dir.glob("*.json"))
+            if doc_files:
+                workers = min(DOC_LOAD_WORKERS, len(doc_files))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    for doc_id, doc_data in pool.map(self._read_doc_file, doc_files):
+                        self.documents[doc_id] = doc_data
                     
             logger.info(f"Loaded {len(self.documents)} documentation files")
             
         except Exception as e:
             logger.error(f"Error loading documentation files: {e}")
             
+    @staticmethod
+    def _read_doc_file(doc_file: Path):
+        """Read and parse one documentation file"""
+        return doc_file.stem, _loads(doc_file.read_bytes())
+        
+    def _build_term_filter(self):
+        """Build the term Bloom filter from all loaded documents"""
+        terms = set()
+        for doc in self.documents.values():
+            terms.update(self._document_terms(doc))
+            
+        self.term_filter = TermBloomFilter(capacity=max(1024, 2 * len(terms)))
+        for term in terms:
+            self.term_filter.add(term)
+            
+    def _build_document_index(self):
+        """Precompute the per-document data that lookups and answers read"""
+        self._title_text = ''
+        self._title_starts = []
+        self._title_ids = []
+        self._sentences = {}
+        for doc_id, doc in self.documents.items():
+            self._index_document(doc_id, doc)
+            
+    def _index_document(self, doc_id: str, doc: Dict[str, Any]):
+        """Append a document to the title index and split its sentences"""
+        # Titles are concatenated so lookups are a single substring search
+        self._title_starts.append(len(self._title_text))
+        self._title_ids.append(doc_id)
+        self._title_text += doc.get('title', '').lower() + TITLE_SEPARATOR
+        
+        content = doc.get('content', '')
+        if content not in self._sentences:
+            self._sentences[content] = self._split_sentences(content)
+            
+    @staticmethod
+    def _split_sentences(content: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """Lowercase content and split it into (answer sentence, lowercased sentence) pairs"""
+        content_lower = content.lower()
+        return content_lower, list(zip(
+            (s.strip() + '.' for s in content.split('.')),
+            content_lower.split('.')
+        ))
+        
+    def _find_title(self, command: str) -> Optional[str]:
+        """Get the first document whose lowercased title contains command"""
+        if TITLE_SEPARATOR in command:
+            return None
+        pos = self._title_text.find(command)
+        if pos < 0:
+            return None
+        return self._title_ids[bisect.bisect_right(self._title_starts, pos) - 1]
+        
+    def _document_terms(self, doc: Dict[str, Any]) -> List[str]:
+        """Get the indexed terms of a document"""
+        return TOKEN_PATTERN.findall(self._document_text(doc).lower())
+        
+    def _document_text(self, doc: Dict[str, Any]) -> str:
+        """Get the text of a document that is indexed for search"""
+        return f"{doc.get('title', '')} {doc.get('content', '')}"
+        
+    def _ensure_embeddings(self):
+        """Create embeddings if they have not been built yet"""
+        if not self._embeddings_built:
+            self._create_embeddings()
+            self._embeddings_built = True
+            
     def _create_embeddings(self):
         """Create embeddings for semantic search"""
         # For now, use simple TF-IDF style approach
         # In production, would use actual embeddings (e.g., sentence-transformers)
+        self.vocabulary = {}
+        self.doc_counts = []
+        self.doc_ids = []
+        self._doc_freqs = []
         
-        try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
-        except ImportError:
-            logger.warning("scikit-learn not installed. RAG will use simple text matching.")
-            return
+        for doc_id, doc in self.documents.items():
+            self._count_document(doc_id, doc)
+            
+        self._reweight_embeddings()
         
-        # Combine all document content
-        doc_texts = []
-        doc_ids = []
+    def _count_document(self, doc_id: str, doc: Dict[str, Any]):
+        """Record a document's term counts, growing the vocabulary as needed"""
+        counts = Counter()
+        for term in self._document_terms(doc):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                term_id = self.vocabulary[term] = len(self.vocabulary)
+                self._doc_freqs.append(0)
+            counts[term_id] += 1
+            
+        for term_id in counts:
+            self._doc_freqs[term_id] += 1
+        self.doc_counts.append(counts)
+        self.doc_ids.append(doc_id)
         
-        for doc_id, doc in self.documents.items():
-            text = f"{doc.get('title', '')} {doc.get('content', '')}"
-            doc_texts.append(text)
-            doc_ids.append(doc_id)
+    def _append_embedding(self, doc_id: str):
+        """Add one document's term counts and reweight the corpus"""
+        self._count_document(doc_id, self.documents[doc_id])
+        self._reweight_embeddings()
+        
+    def _reweight_embeddings(self):
+        """Apply IDF weights to the term counts and rebuild the postings"""
+        # Smoothed IDF, as scikit-learn's TfidfTransformer computes it
+        num_docs = len(self.doc_counts)
+        self.idf = np.log((1 + num_docs) / (1 + np.asarray(self._doc_freqs, dtype=np.float64))) + 1
+        
+        # Postings map each term to the documents containing it and their
+        # L2-normalized TF-IDF weights, so a query only touches its own terms
+        postings = {}
+        for idx, counts in enumerate(self.doc_counts):
+            weights = {term_id: count * self.idf[term_id] for term_id, count in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term_id, weight in weights.items():
+                postings.setdefault(term_id, ([], []))
+                postings[term_id][0].append(idx)
+                postings[term_id][1].append(weight / norm)
+                
+        self._postings = {
+            term_id: (np.asarray(indices, dtype=np.intp), np.asarray(weights))
+            for term_id, (indices, weights) in postings.items()
+        }
+        
+        # New weights change every score, so the cache is per-fit
+        self._similarities = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._score_query)
+        
+    def _score_query(self, query: str) -> np.ndarray:
+        """Compute cosine similarities between a query and every document"""
+        similarities = np.zeros(len(self.doc_ids))
+        
+        # Terms absent from the corpus carry no weight
+        counts = Counter(
+            self.vocabulary[term] for term in TOKEN_PATTERN.findall(query.lower())
+            if term in self.vocabulary
+        )
+        weights = {term_id: count * self.idf[term_id] for term_id, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        
+        for term_id, weight in weights.items():
+            indices, doc_weights = self._postings[term_id]
+            similarities[indices] += (weight / norm) * doc_weights
             
-        if doc_texts:
-            # Create TF-IDF vectors
-            self.vectorizer = TfidfVectorizer(max_features=1000)
-            self.doc_vectors = self.vectorizer.fit_transform(doc_texts)
-            self.doc_ids = doc_ids
+        return similarities
             
     async def _retrieve_documents(self, query: str, k: int) -> List[Dict[str, Any]]:
         """Retrieve relevant documents for a query"""
-        if not hasattr(self, 'vectorizer'):
-            # No embeddings available, return all docs
-            return list(self.documents.values())[:k]
-            
-        # Vectorize query
-        query_vector = self.vectorizer.transform([query])
+        self._ensure_embeddings()
         
         # Calculate similarities
-        similarities = (self.doc_vectors * query_vector.T).toarray().flatten()
+        similarities = self._similarities(query)
         
-        # Get top k documents
-        top_indices = np.argsort(similarities)[::-1][:k]
+        # Get top k documents, sorting only the partitioned candidates
+        k = min(k, similarities.size)
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        top_indices = candidates[np.argsort(-similarities[candidates], kind='stable')]
         
         relevant_docs = []
         for idx in top_indices:
@@ -277,19 +472,22 @@ class ResolveDocRAG:
         
         # Extract relevant information
         question_lower = question.lower()
+        question_words = tuple(dict.fromkeys(question_lower.split()))
         
         for doc in documents:
             content = doc.get('content', '')
+            split = self._sentences.get(content)
+            if split is None:
+                split = self._split_sentences(content)
+            content_lower, sentences = split
             
-            # Find relevant sentences
-            sentences = content.split('.')
-            relevant_sentences = [
-                s.strip() + '.' for s in sentences
-                if any(word in s.lower() for word in question_lower.split())
-            ]
-            
-            if relevant_sentences:
-                answer_parts.extend(relevant_sentences[:2])
+            # Find the first two relevant sentences, skipping documents that
+            # contain none of the question words at all
+            if any(word in content_lower for word in question_words):
+                answer_parts.extend(islice((
+                    sentence for sentence, s_lower in sentences
+                    if any(word in s_lower for word in question_words)
+                ), 2))
                 
             # Add examples if available
             if 'examples' in doc and doc['examples']:
@@ -308,14 +506,31 @@ class ResolveDocRAG:
         
     def add_document(self, doc_id: str, title: str, content: str, metadata: Dict[str, Any] = None):
         """Add a new document to the RAG system"""
+        replaced = doc_id in self.documents
         self.documents[doc_id] = {
             'title': title,
             'content': content,
             'metadata': metadata or {}
         }
         
-        # Recreate embeddings
-        self._create_embeddings()
+        # Make the new terms visible to the prefilter
+        if self.term_filter is not None:
+            for term in self._document_terms(self.documents[doc_id]):
+                self.term_filter.add(term)
+                
+        # Replacing a title keeps its position, so the index is rebuilt
+        if replaced:
+            self._build_document_index()
+        else:
+            self._index_document(doc_id, self.documents[doc_id])
+        
+        # Unbuilt embeddings pick the document up on first retrieval; otherwise
+        # only the new document needs vectorizing, and a replaced one moves rows
+        if self._embeddings_built:
+            if not replaced:
+                self._append_embedding(doc_id)
+            else:
+                self._create_embeddings()
         
     def update_from_feedback(self, question: str, answer: str, was_helpful: bool):
         """Update documentation based on user feedback"""
@@ -327,4 +542,18 @@ class ResolveDocRAG:
                 f"Q: {question}",
                 f"A: {answer}",
                 {'type': 'feedback', 'helpful': True}
-            )
\ No newline at end of file
+            )
+
+
+_doc_rag = None
+_doc_rag_lock = threading.Lock()
+
+
+def get_doc_rag() -> ResolveDocRAG:
+    """Get the process-wide ResolveDocRAG, creating it on first use"""
+    global _doc_rag
+    if _doc_rag is None:
+        with _doc_rag_lock:
+            if _doc_rag is None:
+                _doc_rag = ResolveDocRAG()
+    return _doc_rag
\ No newline at end of file
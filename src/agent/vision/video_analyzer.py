@@ -2,10 +2,14 @@
 Video analyzer using vision models for understanding video content
 """
 
+import asyncio
 import logging
 import os
 import base64
-from typing import Dict, Any, List, Optional, Tuple
+import queue
+import threading
+from functools import cached_property
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import cv2
 import numpy as np
 from PIL import Image
@@ -13,6 +17,64 @@ import io
 
 logger = logging.getLogger(__name__)
 
+# Optical flow runs on frames downscaled by this factor
+FLOW_SCALE = 0.5
+
+# Decoded frames the reader thread may buffer ahead of the consumer
+FRAME_PREFETCH = 4
+
+# Sample gaps, in frames, short enough to decode through instead of seeking
+SEEK_GAP_THRESHOLD = 60
+
+# Longest side, in pixels, of the working resolution for composition edges
+COMPOSITION_SIZE = 480
+
+# JPEG quality for frames sent to vision models
+JPEG_QUALITY = 80
+
+# Vision model requests allowed in flight at once
+VISION_CONCURRENCY = 8
+
+# Pixels sampled from each frame for dominant color clustering
+DOMINANT_COLOR_SAMPLES = 10000
+
+
+class FrameFeatures:
+    """Derived images of a frame, each computed at most once and shared by the helpers of a pass"""
+    
+    def __init__(self, frame: np.ndarray):
+        self.frame = frame
+        
+    @cached_property
+    def gray(self) -> np.ndarray:
+        """Grayscale frame"""
+        return cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        
+    @cached_property
+    def composition_scale(self) -> float:
+        """Downscale factor that brings the frame to composition working resolution"""
+        return min(1.0, COMPOSITION_SIZE / max(self.gray.shape))
+        
+    @cached_property
+    def edges(self) -> np.ndarray:
+        """Canny edges of the grayscale frame at composition working resolution"""
+        gray = self.gray
+        if self.composition_scale < 1.0:
+            gray = cv2.resize(gray, None, fx=self.composition_scale, fy=self.composition_scale,
+                              interpolation=cv2.INTER_AREA)
+        return cv2.Canny(gray, 50, 150)
+        
+    @cached_property
+    def laplacian(self) -> np.ndarray:
+        """Laplacian of the grayscale frame"""
+        # The 3x3 aperture on uint8 input spans -1020..1020, so int16 is exact
+        return cv2.Laplacian(self.gray, cv2.CV_16S)
+        
+    @cached_property
+    def blur(self) -> np.ndarray:
+        """Gaussian-blurred grayscale frame"""
+        return cv2.GaussianBlur(self.gray, (5, 5), 0)
+
 
 class VideoAnalyzer:
     """Analyzes video content using vision models"""
@@ -20,6 +82,7 @@ class VideoAnalyzer:
     def __init__(self):
         self.vision_models = self._initialize_vision_models()
         self.frame_sample_rate = 30  # Sample every 30 frames
+        self._flow_estimator = None
         
     async def analyze(self, video_path: str, analysis_type: str = "general") -> Dict[str, Any]:
         """
@@ -65,6 +128,51 @@ class VideoAnalyzer:
         """Extract frames from video file"""
         frames = []
         
+        # Decoding runs on a reader thread; the event loop only waits on the queue
+        frame_queue = queue.Queue(maxsize=FRAME_PREFETCH)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=self._read_frames, args=(video_path, frame_queue, stop), daemon=True
+        )
+        reader.start()
+        
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                frame = await loop.run_in_executor(None, self._next_frame, frame_queue, stop)
+                if frame is None:
+                    break
+                frames.append(frame)
+        finally:
+            stop.set()
+            
+        return frames
+        
+    @staticmethod
+    def _next_frame(frame_queue: queue.Queue, stop: threading.Event) -> Optional[np.ndarray]:
+        """Wait for the next decoded frame, returning None once stopped"""
+        # Poll so a cancelled consumer's executor thread is released instead of
+        # blocking forever on a queue the reader will no longer fill
+        while not stop.is_set():
+            try:
+                return frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+        
+    def _read_frames(self, video_path: str, frame_queue: queue.Queue, stop: threading.Event):
+        """Decode sampled frames onto a queue, ending with None"""
+        def put(item) -> bool:
+            # Give up if the consumer has gone away instead of blocking forever
+            while not stop.is_set():
+                try:
+                    frame_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+            
+        cap = None
         try:
             cap = cv2.VideoCapture(video_path)
             frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -72,25 +180,41 @@ class VideoAnalyzer:
             # Sample frames evenly throughout the video
             sample_indices = np.linspace(0, frame_count - 1, min(10, frame_count), dtype=int)
             
+            position = 0
             for idx in sample_indices:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+                gap = idx - position
+                if 0 <= gap < SEEK_GAP_THRESHOLD:
+                    # Grabbing skips the colour conversion and avoids a keyframe re-decode
+                    if not all(cap.grab() for _ in range(gap)):
+                        break
+                else:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+                position = idx + 1
+                
                 ret, frame = cap.read()
-                if ret:
-                    frames.append(frame)
+                if ret and not put(frame):
+                    return
                     
-            cap.release()
-            
         except Exception as e:
             logger.error(f"Error extracting frames: {e}")
             
-        return frames
-        
+        finally:
+            if cap is not None:
+                cap.release()
+            put(None)
+            
     async def _get_timeline_frames(self) -> List[np.ndarray]:
         """Get frames from current timeline"""
         # This would integrate with Resolve to export frames
         # For now, return empty list
         return []
         
+    async def _map_frames(self, func: Callable[[np.ndarray], Any], frames: List[np.ndarray]) -> List[Any]:
+        """Run a per-frame function on worker threads, returning results in frame order"""
+        # OpenCV releases the GIL, so frames are processed in parallel
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(None, func, frame) for frame in frames))
+        
     async def _general_analysis(self, frames: List[np.ndarray]) -> Dict[str, Any]:
         """Perform general video analysis"""
         results = {
@@ -101,14 +225,22 @@ class VideoAnalyzer:
             'quality_metrics': {}
         }
         
-        # Analyze each frame with vision model
-        for i, frame in enumerate(frames):
-            # Convert frame to base64 for API calls
-            frame_b64 = self._frame_to_base64(frame)
-            
-            # Call vision model (placeholder - would use actual API)
-            analysis = await self._call_vision_model(frame_b64, "describe")
-            
+        # Encode frames on worker threads and call the vision model for
+        # several frames at once; gather keeps the results in frame order
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(VISION_CONCURRENCY)
+        
+        async def describe(frame: np.ndarray) -> Dict[str, Any]:
+            async with semaphore:
+                frame_b64 = await loop.run_in_executor(None, self._frame_to_base64, frame)
+                return await self._call_vision_model(frame_b64, "describe")
+                
+        analyses = await asyncio.gather(*(describe(frame) for frame in frames))
+        
+        # Ordered set of objects, in the order they were first seen
+        detected_objects = {}
+        
+        for i, analysis in enumerate(analyses):
             if analysis:
                 results['content_description'].append({
                     'frame': i,
@@ -116,13 +248,14 @@ class VideoAnalyzer:
                 })
                 
                 # Extract objects
-                objects = analysis.get('objects', [])
-                for obj in objects:
-                    if obj not in results['detected_objects']:
-                        results['detected_objects'].append(obj)
-                        
+                detected_objects.update(dict.fromkeys(analysis.get('objects', [])))
+                
+        results['detected_objects'] = list(detected_objects)
+        
         # Analyze quality
-        results['quality_metrics'] = self._analyze_quality(frames)
+        results['quality_metrics'] = self._summarize_quality(
+            await self._map_frames(self._frame_quality, frames)
+        )
         
         return results
         
@@ -136,31 +269,34 @@ class VideoAnalyzer:
             'brightness_stats': {}
         }
         
-        for frame in frames:
-            # Convert to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Get dominant colors
-            dominant = self._get_dominant_colors(rgb_frame)
+        brightness = np.empty(len(frames))
+        for i, (dominant, frame_brightness) in enumerate(
+            await self._map_frames(self._frame_colors, frames)
+        ):
             results['dominant_colors'].extend(dominant)
+            brightness[i] = frame_brightness
             
-            # Calculate brightness
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            brightness = np.mean(gray)
-            
-            if 'mean' not in results['brightness_stats']:
-                results['brightness_stats']['mean'] = []
-            results['brightness_stats']['mean'].append(brightness)
-            
-        # Average brightness
-        results['brightness_stats']['average'] = np.mean(results['brightness_stats']['mean'])
-        results['brightness_stats']['std'] = np.std(results['brightness_stats']['mean'])
+        # Per-frame and average brightness
+        results['brightness_stats']['mean'] = brightness.tolist()
+        results['brightness_stats']['average'] = brightness.mean()
+        results['brightness_stats']['std'] = brightness.std()
         
         # Determine color temperature
         results['color_temperature'] = self._estimate_color_temperature(frames)
         
         return results
         
+    def _frame_colors(self, frame: np.ndarray) -> Tuple[List[Tuple[int, int, int]], float]:
+        """Dominant colors and brightness of one frame"""
+        # Convert to RGB
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        # Get dominant colors
+        dominant = self._get_dominant_colors(rgb_frame)
+        
+        # Calculate brightness
+        return dominant, cv2.mean(FrameFeatures(frame).gray)[0]
+        
     async def _composition_analysis(self, frames: List[np.ndarray]) -> Dict[str, Any]:
         """Analyze composition and framing"""
         results = {
@@ -171,31 +307,44 @@ class VideoAnalyzer:
             'focal_points': []
         }
         
-        for i, frame in enumerate(frames):
-            # Rule of thirds analysis
-            thirds_score = self._check_rule_of_thirds(frame)
+        loop = asyncio.get_running_loop()
+        symmetry = loop.run_in_executor(None, self._calculate_symmetry, frames)
+        
+        compositions = await self._map_frames(self._frame_composition, frames)
+        for i, (thirds_score, line_count, focal_points) in enumerate(compositions):
             results['rule_of_thirds'].append({
                 'frame': i,
                 'score': thirds_score
             })
             
-            # Detect leading lines
-            lines = self._detect_leading_lines(frame)
-            if lines:
+            if line_count:
                 results['leading_lines'].append({
                     'frame': i,
-                    'lines': len(lines)
+                    'lines': line_count
                 })
                 
-            # Find focal points using saliency detection
-            focal_points = self._detect_focal_points(frame)
             results['focal_points'].extend(focal_points)
             
         # Calculate average symmetry
-        results['symmetry_score'] = self._calculate_symmetry(frames)
+        results['symmetry_score'] = await symmetry
         
         return results
         
+    def _frame_composition(self, frame: np.ndarray) -> Tuple[float, int, List[Tuple[int, int]]]:
+        """Rule of thirds score, leading line count and focal points of one frame"""
+        features = FrameFeatures(frame)
+        
+        # Rule of thirds analysis
+        thirds_score = self._check_rule_of_thirds(features)
+        
+        # Detect leading lines
+        lines = self._detect_leading_lines(features)
+        
+        # Find focal points using saliency detection
+        focal_points = self._detect_focal_points(features)
+        
+        return thirds_score, len(lines), focal_points
+        
     async def _motion_analysis(self, frames: List[np.ndarray]) -> Dict[str, Any]:
         """Analyze motion in video"""
         results = {
@@ -208,19 +357,9 @@ class VideoAnalyzer:
         if len(frames) < 2:
             return results
             
-        # Calculate optical flow between consecutive frames
-        motion_scores = []
-        
-        for i in range(len(frames) - 1):
-            flow = cv2.calcOpticalFlowFarneback(
-                cv2.cvtColor(frames[i], cv2.COLOR_BGR2GRAY),
-                cv2.cvtColor(frames[i + 1], cv2.COLOR_BGR2GRAY),
-                None, 0.5, 3, 15, 3, 5, 1.2, 0
-            )
-            
-            # Calculate motion magnitude
-            magnitude = np.sqrt(flow[..., 0]**2 + flow[..., 1]**2)
-            motion_scores.append(np.mean(magnitude))
+        # The flow estimator is not thread-safe, so all pairs share one worker
+        loop = asyncio.get_running_loop()
+        motion_scores = await loop.run_in_executor(None, self._motion_scores, frames)
             
         # Determine motion intensity
         avg_motion = np.mean(motion_scores)
@@ -239,6 +378,22 @@ class VideoAnalyzer:
         
         return results
         
+    def _motion_scores(self, frames: List[np.ndarray]) -> List[float]:
+        """Mean optical flow magnitude between each pair of consecutive frames"""
+        # Convert each frame once, at the half resolution flow is computed on
+        grays = [
+            cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), None,
+                       fx=FLOW_SCALE, fy=FLOW_SCALE, interpolation=cv2.INTER_AREA)
+            for frame in frames
+        ]
+        
+        # Calculate optical flow between consecutive frames, scaling the
+        # magnitudes back to full-resolution pixels for the motion thresholds
+        return [
+            self._mean_flow_magnitude(grays[i], grays[i + 1]) / FLOW_SCALE
+            for i in range(len(grays) - 1)
+        ]
+        
     async def _scene_detection(self, frames: List[np.ndarray]) -> Dict[str, Any]:
         """Detect scene changes and types"""
         results = {
@@ -248,32 +403,79 @@ class VideoAnalyzer:
             'shot_types': []
         }
         
-        # Detect scene changes using histogram comparison
-        prev_hist = None
-        
-        for i, frame in enumerate(frames):
-            # Calculate histogram
-            hist = cv2.calcHist([frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
-            hist = cv2.normalize(hist, hist).flatten()
+        # Detect scene changes by correlating consecutive color histograms
+        if len(frames) > 1:
+            hists = np.stack(await self._map_frames(self._color_histogram, frames))
             
-            if prev_hist is not None:
-                # Compare with previous frame
-                similarity = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_CORREL)
-                
-                # Detect scene change
+            for i, similarity in enumerate(self._consecutive_correlations(hists), start=1):
                 if similarity < 0.7:
                     results['scene_changes'].append(i)
                     results['scene_count'] += 1
                     
-            prev_hist = hist
-            
+        scene_types = {}
+        for frame in frames:
             # Classify scene type (placeholder)
-            scene_type = await self._classify_scene(frame)
-            if scene_type not in results['scene_types']:
-                results['scene_types'].append(scene_type)
-                
+            scene_types[await self._classify_scene(frame)] = None
+            
+        results['scene_types'] = list(scene_types)
         return results
         
+    @staticmethod
+    def _color_histogram(frame: np.ndarray) -> np.ndarray:
+        """Flattened 8x8x8 joint color histogram of a frame"""
+        return cv2.calcHist([frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256]).ravel()
+        
+    def _consecutive_correlations(self, hists: np.ndarray) -> np.ndarray:
+        """
+        Correlate each histogram row with the next, as cv2.HISTCMP_CORREL does
+        
+        Correlation is scale-invariant, so the histograms need no normalizing.
+        Rows with no variance correlate as 1, matching OpenCV.
+        """
+        centered = hists - hists.mean(axis=1, keepdims=True)
+        numerator = np.einsum('ij,ij->i', centered[:-1], centered[1:])
+        sq = np.einsum('ij,ij->i', centered, centered)
+        denominator = np.sqrt(sq[:-1] * sq[1:])
+        
+        similarities = np.ones_like(numerator)
+        valid = denominator > np.finfo(np.float64).eps
+        similarities[valid] = numerator[valid] / denominator[valid]
+        return similarities
+        
+    def _create_flow_estimator(self) -> Tuple[str, Any]:
+        """Create the dense optical flow estimator, on the GPU when CUDA is available"""
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                # Same pyramid and window settings the CPU Farneback used
+                return 'cuda', cv2.cuda_FarnebackOpticalFlow.create(3, 0.5, False, 15, 3, 5, 1.2, 0)
+        except (AttributeError, cv2.error):
+            pass
+            
+        dis = cv2.DISOpticalFlow_create(cv2.DISOPTICAL_FLOW_PRESET_FAST)
+        dis.setUseSpatialPropagation(True)
+        return 'cpu', dis
+        
+    def _mean_flow_magnitude(self, prev_gray: np.ndarray, next_gray: np.ndarray) -> float:
+        """Compute the mean optical flow magnitude between two grayscale frames"""
+        if self._flow_estimator is None:
+            self._flow_estimator = self._create_flow_estimator()
+        device, estimator = self._flow_estimator
+        
+        if device == 'cuda':
+            prev_gpu = cv2.cuda_GpuMat()
+            next_gpu = cv2.cuda_GpuMat()
+            prev_gpu.upload(prev_gray)
+            next_gpu.upload(next_gray)
+            flow_x, flow_y = cv2.cuda.split(estimator.calc(prev_gpu, next_gpu, None))
+            # Only the magnitude comes back to host memory
+            magnitude = cv2.cuda.magnitude(flow_x, flow_y).download()
+        else:
+            # Split into contiguous planes; strided channel views make OpenCV copy
+            flow_x, flow_y = cv2.split(estimator.calc(prev_gray, next_gray, None))
+            magnitude = cv2.magnitude(flow_x, flow_y)
+            
+        return cv2.mean(magnitude)[0]
+        
     def _initialize_vision_models(self) -> Dict[str, Any]:
         """Initialize vision model configurations"""
         return {
@@ -293,7 +495,7 @@ class VideoAnalyzer:
         
     def _frame_to_base64(self, frame: np.ndarray) -> str:
         """Convert frame to base64 string"""
-        _, buffer = cv2.imencode('.jpg', frame)
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
         return base64.b64encode(buffer).decode('utf-8')
         
     async def _call_vision_model(self, frame_b64: str, task: str) -> Dict[str, Any]:
@@ -311,35 +513,31 @@ class VideoAnalyzer:
         # Reshape frame to list of pixels
         pixels = frame.reshape((-1, 3))
         
-        try:
-            # Use k-means to find dominant colors
-            from sklearn.cluster import KMeans
-            kmeans = KMeans(n_clusters=k, random_state=42)
-            kmeans.fit(pixels)
+        # Cluster a fixed-size random sample; the dominant colors of a frame
+        # are stable well below full resolution
+        if len(pixels) > DOMINANT_COLOR_SAMPLES:
+            rng = np.random.default_rng(42)
+            pixels = pixels[rng.integers(0, len(pixels), DOMINANT_COLOR_SAMPLES)]
             
-            # Get cluster centers (dominant colors)
-            colors = kmeans.cluster_centers_.astype(int)
+        if len(pixels) <= k:
+            return [tuple(color) for color in pixels.astype(int)]
             
-            return [tuple(color) for color in colors]
-        except ImportError:
-            # Fallback: simple color sampling
-            # Sample colors at regular intervals
-            step = len(pixels) // k
-            sampled_colors = pixels[::step][:k]
-            return [tuple(color) for color in sampled_colors]
+        # Use k-means to find dominant colors
+        cv2.setRNGSeed(42)
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
+        _, _, centers = cv2.kmeans(
+            pixels.astype(np.float32), k, None, criteria, 3, cv2.KMEANS_PP_CENTERS
+        )
+        
+        # Cluster centers are the dominant colors
+        return [tuple(color) for color in centers.astype(int)]
         
     def _estimate_color_temperature(self, frames: List[np.ndarray]) -> str:
         """Estimate overall color temperature"""
-        # Simplified color temperature estimation
-        total_r = 0
-        total_b = 0
-        
-        for frame in frames:
-            total_r += np.mean(frame[:, :, 2])  # Red channel
-            total_b += np.mean(frame[:, :, 0])  # Blue channel
-            
-        avg_r = total_r / len(frames)
-        avg_b = total_b / len(frames)
+        # Simplified color temperature estimation; cv2.mean reduces all
+        # channels of a frame in a single pass
+        channel_means = np.array([cv2.mean(frame)[:3] for frame in frames])
+        avg_b, _, avg_r = channel_means.mean(axis=0)  # BGR channel order
         
         ratio = avg_r / avg_b if avg_b > 0 else 1
         
@@ -350,69 +548,72 @@ class VideoAnalyzer:
         else:
             return "neutral"
             
-    def _check_rule_of_thirds(self, frame: np.ndarray) -> float:
+    def _check_rule_of_thirds(self, features: FrameFeatures) -> float:
         """Check if composition follows rule of thirds"""
-        # Simplified rule of thirds check
-        h, w = frame.shape[:2]
+        # Simplified rule of thirds check, on the downscaled edge map
+        edges = features.edges
+        h, w = edges.shape
+        band = max(2, int(5 * features.composition_scale))
         
         # Define rule of thirds lines
         v1, v2 = w // 3, 2 * w // 3
         h1, h2 = h // 3, 2 * h // 3
         
-        # Use edge detection to find key elements
-        edges = cv2.Canny(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 50, 150)
-        
         # Check how many edges align with thirds lines
         score = 0
-        score += np.sum(edges[:, v1-5:v1+5]) / 255
-        score += np.sum(edges[:, v2-5:v2+5]) / 255
-        score += np.sum(edges[h1-5:h1+5, :]) / 255
-        score += np.sum(edges[h2-5:h2+5, :]) / 255
+        score += np.sum(edges[:, v1-band:v1+band]) / 255
+        score += np.sum(edges[:, v2-band:v2+band]) / 255
+        score += np.sum(edges[h1-band:h1+band, :]) / 255
+        score += np.sum(edges[h2-band:h2+band, :]) / 255
         
         return min(score / (h * w * 0.01), 1.0)
         
-    def _detect_leading_lines(self, frame: np.ndarray) -> List[Any]:
+    def _detect_leading_lines(self, features: FrameFeatures) -> List[Any]:
         """Detect leading lines in frame"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-        
-        # Detect lines using Hough transform
-        lines = cv2.HoughLinesP(edges, 1, np.pi/180, 100, minLineLength=100, maxLineGap=10)
+        # Detect lines using Hough transform; votes and lengths are in
+        # pixels, so they shrink with the downscaled edge map
+        scale = features.composition_scale
+        lines = cv2.HoughLinesP(features.edges, 1, np.pi/180, max(1, int(100 * scale)),
+                                minLineLength=100 * scale, maxLineGap=max(1, 10 * scale))
         
         return lines if lines is not None else []
         
-    def _detect_focal_points(self, frame: np.ndarray) -> List[Tuple[int, int]]:
+    def _detect_focal_points(self, features: FrameFeatures) -> List[Tuple[int, int]]:
         """Detect focal points using saliency detection"""
-        # Simplified saliency detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Use Laplacian for edge detection
-        lap = cv2.Laplacian(gray, cv2.CV_64F)
-        lap = np.absolute(lap)
+        # Simplified saliency detection, using Laplacian for edge detection
+        lap = np.absolute(features.laplacian)
         
-        # Find peaks
-        focal_points = []
+        # Divide into regions and find local maxima
         h, w = lap.shape
+        tile_h, tile_w = h//3, w//3
+        rows, cols = -(-h // tile_h), -(-w // tile_w)
         
-        # Divide into regions and find local maxima
-        for i in range(0, h, h//3):
-            for j in range(0, w, w//3):
-                region = lap[i:i+h//3, j:j+w//3]
-                if region.size > 0:
-                    max_loc = np.unravel_index(np.argmax(region), region.shape)
-                    focal_points.append((j + max_loc[1], i + max_loc[0]))
-                    
-        return focal_points
+        # Pad partial edge tiles with a value every magnitude beats
+        pad_h, pad_w = rows * tile_h - h, cols * tile_w - w
+        if pad_h or pad_w:
+            lap = np.pad(lap, ((0, pad_h), (0, pad_w)), constant_values=-1)
+        
+        blocks = lap.reshape(rows, tile_h, cols, tile_w).swapaxes(1, 2)
+        peaks = blocks.reshape(rows * cols, -1).argmax(axis=1)
+        dy, dx = np.unravel_index(peaks, (tile_h, tile_w))
+        
+        tile_rows, tile_cols = np.divmod(np.arange(rows * cols), cols)
+        xs = tile_cols * tile_w + dx
+        ys = tile_rows * tile_h + dy
+        return list(zip(xs.tolist(), ys.tolist()))
         
     def _calculate_symmetry(self, frames: List[np.ndarray]) -> float:
         """Calculate average symmetry score"""
         scores = []
         
         for frame in frames:
-            # Flip horizontally and compare
-            flipped = cv2.flip(frame, 1)
-            diff = cv2.absdiff(frame, flipped)
-            score = 1.0 - (np.mean(diff) / 255.0)
+            # Compare the left half with the mirrored right half; the full
+            # frame-vs-flip difference is that same difference counted twice
+            w = frame.shape[1]
+            half = w // 2
+            mirrored = cv2.flip(frame[:, w - half:], 1)
+            diff_sum = 2 * cv2.norm(frame[:, :half], mirrored, cv2.NORM_L1)
+            score = 1.0 - diff_sum / (frame.size * 255.0)
             scores.append(score)
             
         return np.mean(scores)
@@ -435,30 +636,33 @@ class VideoAnalyzer:
         
     def _analyze_quality(self, frames: List[np.ndarray]) -> Dict[str, Any]:
         """Analyze video quality metrics"""
-        results = {
-            'sharpness': [],
-            'noise_level': [],
-            'exposure': []
-        }
+        return self._summarize_quality([self._frame_quality(frame) for frame in frames])
+        
+    @staticmethod
+    def _frame_quality(frame: np.ndarray) -> Tuple[float, float, float]:
+        """Sharpness, noise and exposure of one frame"""
+        features = FrameFeatures(frame)
+        gray = features.gray
+        
+        # Sharpness using Laplacian variance
+        _, lap_std = cv2.meanStdDev(features.laplacian)
+        
+        # Noise estimation from the high-frequency residual, kept signed
+        residual = cv2.subtract(gray, features.blur, dtype=cv2.CV_16S)
+        _, noise_std = cv2.meanStdDev(residual)
+        
+        # Exposure
+        return lap_std[0, 0] ** 2, noise_std[0, 0], cv2.mean(gray)[0] / 255.0
+        
+    @staticmethod
+    def _summarize_quality(metrics: List[Tuple[float, float, float]]) -> Dict[str, Any]:
+        """Average per-frame (sharpness, noise, exposure) metrics"""
+        sharpness, noise_level, exposure = np.array(metrics, dtype=float).reshape(-1, 3).T
         
-        for frame in frames:
-            # Sharpness using Laplacian variance
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
-            results['sharpness'].append(sharpness)
-            
-            # Noise estimation
-            noise = np.std(gray - cv2.GaussianBlur(gray, (5, 5), 0))
-            results['noise_level'].append(noise)
-            
-            # Exposure
-            exposure = np.mean(gray) / 255.0
-            results['exposure'].append(exposure)
-            
         # Calculate averages
         return {
-            'avg_sharpness': np.mean(results['sharpness']),
-            'avg_noise': np.mean(results['noise_level']),
-            'avg_exposure': np.mean(results['exposure']),
-            'quality_score': min(np.mean(results['sharpness']) / 100, 1.0)
+            'avg_sharpness': sharpness.mean(),
+            'avg_noise': noise_level.mean(),
+            'avg_exposure': exposure.mean(),
+            'quality_score': min(sharpness.mean() / 100, 1.0)
         }
\ No newline at end of file
@@ -5,29 +5,79 @@ DaVinci Resolve Media Operations
 
 import logging
 import os
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Tuple
 
 logger = logging.getLogger("davinci-resolve-mcp.media")
 
+# Seconds a looked-up project / media pool / root folder chain is reused
+PROJECT_CONTEXT_TTL = 0.5
+
+# id(resolve) -> (expiry, resolve, project_manager, project_id, media_pool, root_folder)
+_project_context_cache: Dict[int, Tuple[Any, ...]] = {}
+
+def _project_context(resolve) -> Tuple[Any, Any, Any, Any]:
+    """Return (project_manager, project, media_pool, root_folder), None from the first failed lookup on."""
+    now = time.monotonic()
+    cached = _project_context_cache.get(id(resolve))
+    if cached and cached[1] is resolve and now < cached[0]:
+        project_manager = cached[2]
+    else:
+        cached = None
+        project_manager = resolve.GetProjectManager()
+    
+    current_project = project_manager.GetCurrentProject() if project_manager else None
+    if not current_project:
+        return project_manager, None, None, None
+    
+    # The current project is always asked for, so a project opened, created or
+    # switched to (here or in the Resolve UI) never reuses the old media pool
+    project_id = current_project.GetUniqueId()
+    if cached and cached[3] == project_id:
+        return project_manager, current_project, cached[4], cached[5]
+    
+    media_pool = current_project.GetMediaPool()
+    root_folder = media_pool.GetRootFolder() if media_pool else None
+    
+    # Only complete chains are cached, so a failure is retried on the next call
+    if root_folder:
+        _project_context_cache[id(resolve)] = (now + PROJECT_CONTEXT_TTL, resolve, project_manager, project_id, media_pool, root_folder)
+    return project_manager, current_project, media_pool, root_folder
+
+# id(resolve) -> (expiry, root_folder, {clip name: clip}) for the root folder's clips
+_clip_index_cache: Dict[int, Tuple[Any, ...]] = {}
+
+def _find_root_clip(resolve, root_folder, clip_name: str):
+    """Look up a root folder clip by name, indexing the clip names once per PROJECT_CONTEXT_TTL."""
+    now = time.monotonic()
+    cached = _clip_index_cache.get(id(resolve))
+    if cached and cached[1] is root_folder and now < cached[0]:
+        clip = cached[2].get(clip_name)
+        if clip:
+            return clip
+    
+    # Build or rebuild the index; a miss may be a clip imported since the last build
+    index = {}
+    for clip in root_folder.GetClipList():
+        index.setdefault(clip.GetName(), clip)
+    _clip_index_cache[id(resolve)] = (now + PROJECT_CONTEXT_TTL, root_folder, index)
+    return index.get(clip_name)
+
 def list_media_pool_clips(resolve) -> List[Dict[str, Any]]:
     """List all clips in the media pool of the current project."""
     if resolve is None:
         return [{"error": "Not connected to DaVinci Resolve"}]
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return [{"error": "Failed to get Project Manager"}]
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return [{"error": "No project currently open"}]
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return [{"error": "Failed to get Media Pool"}]
     
-    # Get the root folder and all its clips
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return [{"error": "Failed to get Root Folder"}]
     
@@ -37,11 +87,13 @@ def list_media_pool_clips(resolve) -> List[Dict[str, Any]]:
     clip_info = []
     for clip in clips:
         if clip:
+            # Fetch the properties once; each call is a roundtrip into Resolve
+            properties = clip.GetClipProperty()
             clip_info.append({
                 "name": clip.GetName(),
-                "type": clip.GetClipProperty()["Type"],
-                "duration": clip.GetClipProperty()["Duration"],
-                "fps": clip.GetClipProperty().get("FPS", "Unknown")
+                "type": properties["Type"],
+                "duration": properties["Duration"],
+                "fps": properties.get("FPS", "Unknown")
             })
     
     return clip_info if clip_info else [{"info": "No clips found in the media pool"}]
@@ -58,15 +110,13 @@ def import_media(resolve, file_path: str) -> str:
     if not os.path.exists(file_path):
         return f"Error: File '{file_path}' does not exist"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
@@ -79,6 +129,46 @@ def import_media(resolve, file_path: str) -> str:
     else:
         return f"Failed to import '{file_path}'. The file may be in an unsupported format."
 
+def import_media_batch(resolve, file_paths: List[str]) -> str:
+    """Import several media files into the current project's media pool in one call."""
+    if resolve is None:
+        return "Error: Not connected to DaVinci Resolve"
+    
+    if not file_paths:
+        return "Error: No file paths provided for import"
+    
+    # Validate file paths up front so one bad path does not block the rest
+    existing_paths = []
+    missing_paths = []
+    for path in file_paths:
+        if path and os.path.exists(path):
+            existing_paths.append(path)
+        else:
+            missing_paths.append(path)
+    if not existing_paths:
+        return f"Error: None of the files exist: {', '.join(missing_paths)}"
+    
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
+    if not project_manager:
+        return "Error: Failed to get Project Manager"
+    
+    if not current_project:
+        return "Error: No project currently open"
+    
+    if not media_pool:
+        return "Error: Failed to get Media Pool"
+    
+    # A single ImportMedia call handles the whole list
+    imported_media = media_pool.ImportMedia(existing_paths)
+    
+    if not imported_media:
+        return f"Failed to import {len(existing_paths)} files. They may be in an unsupported format."
+    
+    result = f"Successfully imported {len(imported_media)} of {len(file_paths)} files"
+    if missing_paths:
+        result += f". Files not found: {', '.join(missing_paths)}"
+    return result
+
 def create_bin(resolve, name: str) -> str:
     """Create a new bin/folder in the media pool."""
     if resolve is None:
@@ -87,20 +177,16 @@ def create_bin(resolve, name: str) -> str:
     if not name:
         return "Error: Bin name cannot be empty"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
-    # Get the root folder to add the bin to
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return "Error: Failed to get Root Folder"
     
@@ -123,20 +209,16 @@ def list_bins(resolve) -> List[Dict[str, Any]]:
     if resolve is None:
         return [{"error": "Not connected to DaVinci Resolve"}]
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return [{"error": "Failed to get Project Manager"}]
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return [{"error": "No project currently open"}]
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return [{"error": "Failed to get Media Pool"}]
     
-    # Get the root folder
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return [{"error": "Failed to get Root Folder"}]
     
@@ -174,20 +256,16 @@ def get_bin_contents(resolve, bin_name: str) -> List[Dict[str, Any]]:
     if resolve is None:
         return [{"error": "Not connected to DaVinci Resolve"}]
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return [{"error": "Failed to get Project Manager"}]
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return [{"error": "No project currently open"}]
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return [{"error": "Failed to get Media Pool"}]
     
-    # Get the root folder
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return [{"error": "Failed to get Root Folder"}]
     
@@ -237,11 +315,10 @@ def list_timeline_clips(resolve) -> List[Dict[str, Any]]:
     if resolve is None:
         return [{"error": "Not connected to DaVinci Resolve"}]
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return [{"error": "Failed to get Project Manager"}]
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return [{"error": "No project currently open"}]
     
@@ -295,28 +372,17 @@ def add_clip_to_timeline(resolve, clip_name: str, timeline_name: str = None) ->
     if not resolve:
         return "Error: Not connected to DaVinci Resolve"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
         
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
-    # Get all clips in root folder
-    root_folder = media_pool.GetRootFolder()
-    clips = root_folder.GetClipList()
-    
-    target_clip = None
-    for clip in clips:
-        if clip.GetName() == clip_name:
-            target_clip = clip
-            break
-    
+    target_clip = _find_root_clip(resolve, root_folder, clip_name)
     if not target_clip:
         return f"Error: Clip '{clip_name}' not found in Media Pool"
     
@@ -362,15 +428,13 @@ def delete_media(resolve, clip_name: str) -> str:
     if resolve is None:
         return "Error: Not connected to DaVinci Resolve"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
@@ -378,8 +442,6 @@ def delete_media(resolve, clip_name: str) -> str:
     all_clips = []
     target_clip = None
     
-    # Get the root folder
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return "Error: Failed to get Root Folder"
     
@@ -408,6 +470,7 @@ def delete_media(resolve, clip_name: str) -> str:
     # Delete the clip
     try:
         result = media_pool.DeleteClips([target_clip])
+        _clip_index_cache.pop(id(resolve), None)
         if result:
             return f"Successfully deleted clip '{clip_name}' from Media Pool"
         else:
@@ -429,20 +492,16 @@ def move_media_to_bin(resolve, clip_name: str, bin_name: str) -> str:
     if resolve is None:
         return "Error: Not connected to DaVinci Resolve"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
-    # Get the root folder
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return "Error: Failed to get Root Folder"
     
@@ -492,6 +551,7 @@ def move_media_to_bin(resolve, clip_name: str, bin_name: str) -> str:
     # Move the clip to the target bin
     try:
         result = media_pool.MoveClips([target_clip], target_folder)
+        _clip_index_cache.pop(id(resolve), None)
         if result:
             return f"Successfully moved clip '{clip_name}' to bin '{bin_name}'"
         else:
@@ -523,20 +583,17 @@ def auto_sync_audio(resolve, clip_names: List[str], sync_method: str = "waveform
     if sync_method not in ["waveform", "timecode"]:
         return "Error: Sync method must be 'waveform' or 'timecode'"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
     # Get all clips from media pool
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return "Error: Failed to get Root Folder"
     
@@ -608,6 +665,7 @@ def auto_sync_audio(resolve, clip_names: List[str], sync_method: str = "waveform
             
             # Move the synced clips to the target bin
             move_result = media_pool.MoveClips(clips_to_sync, target_folder)
+            _clip_index_cache.pop(id(resolve), None)
             if not move_result:
                 return f"Warning: Synced clips but failed to move them to bin '{target_bin}'"
         
@@ -632,20 +690,17 @@ def unlink_clips(resolve, clip_names: List[str]) -> str:
     if not clip_names or len(clip_names) == 0:
         return "Error: No clip names provided for unlinking"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
     # Get all clips from media pool
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return "Error: Failed to get Root Folder"
     
@@ -725,20 +780,17 @@ def relink_clips(resolve, clip_names: List[str], media_paths: List[str] = None,
     if media_paths is not None and len(media_paths) > 0 and len(media_paths) != len(clip_names):
         return "Error: If providing media_paths, the number must match the number of clip_names"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
     # Get all clips from media pool
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return "Error: Failed to get Root Folder"
     
@@ -831,20 +883,17 @@ def create_sub_clip(resolve, clip_name: str, start_frame: int, end_frame: int,
     if start_frame < 0:
         return "Error: Start frame cannot be negative"
     
-    project_manager = resolve.GetProjectManager()
+    project_manager, current_project, media_pool, root_folder = _project_context(resolve)
     if not project_manager:
         return "Error: Failed to get Project Manager"
     
-    current_project = project_manager.GetCurrentProject()
     if not current_project:
         return "Error: No project currently open"
     
-    media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
     # Get all clips from media pool
-    root_folder = media_pool.GetRootFolder()
     if not root_folder:
         return "Error: Failed to get Root Folder"
     
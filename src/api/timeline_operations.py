@@ -3,23 +3,76 @@
 DaVinci Resolve Timeline Operations
 """
 
+import bisect
 import logging
+from itertools import accumulate
 from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger("davinci-resolve-mcp.timeline")
 
-def list_timelines(resolve) -> List[str]:
-    """List all timelines in the current project."""
+# Marker colors accepted by AddMarker, and the list shown when a color is rejected
+_VALID_MARKER_COLORS = frozenset({
+    "Blue", "Cyan", "Green", "Yellow", "Red", "Pink", 
+    "Purple", "Fuchsia", "Rose", "Lavender", "Sky", 
+    "Mint", "Lemon", "Sand", "Cocoa", "Cream"
+})
+_VALID_MARKER_COLORS_DISPLAY = ", ".join(sorted(_VALID_MARKER_COLORS))
+
+# Timeline name -> timeline handle for the project identified by _timeline_cache_project_id
+_timeline_cache: Dict[str, Any] = {}
+_timeline_cache_project_id = None
+
+def _resolve_chain(resolve, with_timeline: bool = False):
+    """Return (project_manager, project, timeline) for the open project, or an error message.
+    
+    The current timeline is only fetched, and required, when with_timeline is set.
+    """
     if resolve is None:
-        return ["Error: Not connected to DaVinci Resolve"]
+        return "Not connected to DaVinci Resolve"
     
     project_manager = resolve.GetProjectManager()
     if not project_manager:
-        return ["Error: Failed to get Project Manager"]
+        return "Failed to get Project Manager"
     
     current_project = project_manager.GetCurrentProject()
     if not current_project:
-        return ["Error: No project currently open"]
+        return "No project currently open"
+    
+    current_timeline = None
+    if with_timeline:
+        current_timeline = current_project.GetCurrentTimeline()
+        if not current_timeline:
+            return "No timeline currently active"
+    
+    return project_manager, current_project, current_timeline
+
+def _get_timeline_by_name(project, name: str):
+    """Find a timeline of the project by name, scanning the project only on a cache miss."""
+    global _timeline_cache_project_id
+    
+    project_id = project.GetUniqueId()
+    if project_id != _timeline_cache_project_id:
+        _timeline_cache.clear()
+        _timeline_cache_project_id = project_id
+    
+    # Verify the hit, since timelines can be renamed or deleted inside Resolve
+    timeline = _timeline_cache.get(name)
+    if timeline and timeline.GetName() == name:
+        return timeline
+    
+    _timeline_cache.clear()
+    for i in range(1, project.GetTimelineCount() + 1):
+        timeline = project.GetTimelineByIndex(i)
+        if timeline:
+            _timeline_cache.setdefault(timeline.GetName(), timeline)
+    return _timeline_cache.get(name)
+
+def list_timelines(resolve) -> List[str]:
+    """List all timelines in the current project."""
+    chain = _resolve_chain(resolve)
+    if isinstance(chain, str):
+        return [f"Error: {chain}"]
+    _, current_project, _ = chain
     
     timeline_count = current_project.GetTimelineCount()
     timelines = []
@@ -33,20 +86,10 @@ def list_timelines(resolve) -> List[str]:
 
 def get_current_timeline_info(resolve) -> Dict[str, Any]:
     """Get information about the current timeline."""
-    if resolve is None:
-        return {"error": "Not connected to DaVinci Resolve"}
-    
-    project_manager = resolve.GetProjectManager()
-    if not project_manager:
-        return {"error": "Failed to get Project Manager"}
-    
-    current_project = project_manager.GetCurrentProject()
-    if not current_project:
-        return {"error": "No project currently open"}
-    
-    current_timeline = current_project.GetCurrentTimeline()
-    if not current_timeline:
-        return {"error": "No timeline currently active"}
+    chain = _resolve_chain(resolve, with_timeline=True)
+    if isinstance(chain, str):
+        return {"error": chain}
+    _, current_project, current_timeline = chain
     
     # Get basic timeline info
     info = {
@@ -63,32 +106,26 @@ def get_current_timeline_info(resolve) -> Dict[str, Any]:
 
 def create_timeline(resolve, name: str) -> str:
     """Create a new timeline with the given name."""
-    if resolve is None:
-        return "Error: Not connected to DaVinci Resolve"
-    
     if not name:
         return "Error: Timeline name cannot be empty"
     
-    project_manager = resolve.GetProjectManager()
-    if not project_manager:
-        return "Error: Failed to get Project Manager"
-    
-    current_project = project_manager.GetCurrentProject()
-    if not current_project:
-        return "Error: No project currently open"
+    chain = _resolve_chain(resolve)
+    if isinstance(chain, str):
+        return f"Error: {chain}"
+    _, current_project, _ = chain
     
     media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
     # Check if timeline already exists to avoid duplicates
-    existing_timelines = list_timelines(resolve)
-    if name in existing_timelines:
+    if _get_timeline_by_name(current_project, name):
         return f"Error: Timeline '{name}' already exists"
     
     # Create the timeline
     timeline = media_pool.CreateEmptyTimeline(name)
     if timeline:
+        _timeline_cache[name] = timeline
         return f"Successfully created timeline '{name}'"
     else:
         return f"Failed to create timeline '{name}'"
@@ -115,27 +152,20 @@ def create_empty_timeline(resolve, name: str,
     Returns:
         String indicating success or failure with detailed error message
     """
-    if resolve is None:
-        return "Error: Not connected to DaVinci Resolve"
-    
     if not name:
         return "Error: Timeline name cannot be empty"
     
-    project_manager = resolve.GetProjectManager()
-    if not project_manager:
-        return "Error: Failed to get Project Manager"
-    
-    current_project = project_manager.GetCurrentProject()
-    if not current_project:
-        return "Error: No project currently open"
+    chain = _resolve_chain(resolve)
+    if isinstance(chain, str):
+        return f"Error: {chain}"
+    _, current_project, _ = chain
     
     media_pool = current_project.GetMediaPool()
     if not media_pool:
         return "Error: Failed to get Media Pool"
     
     # Check if timeline already exists to avoid duplicates
-    existing_timelines = list_timelines(resolve)
-    if name in existing_timelines:
+    if _get_timeline_by_name(current_project, name):
         return f"Error: Timeline '{name}' already exists"
     
     # Store original settings to restore later if needed
@@ -172,6 +202,8 @@ def create_empty_timeline(resolve, name: str,
             current_project.SetSetting(setting_name, setting_value)
         return f"Failed to create timeline '{name}'"
     
+    _timeline_cache[name] = timeline
+    
     # Set the timeline as current to modify it
     current_project.SetCurrentTimeline(timeline)
     
@@ -204,36 +236,26 @@ def create_empty_timeline(resolve, name: str,
 
 def set_current_timeline(resolve, name: str) -> str:
     """Switch to a timeline by name."""
-    if resolve is None:
-        return "Error: Not connected to DaVinci Resolve"
-    
     if not name:
         return "Error: Timeline name cannot be empty"
     
-    project_manager = resolve.GetProjectManager()
-    if not project_manager:
-        return "Error: Failed to get Project Manager"
+    chain = _resolve_chain(resolve)
+    if isinstance(chain, str):
+        return f"Error: {chain}"
+    _, current_project, _ = chain
     
-    current_project = project_manager.GetCurrentProject()
-    if not current_project:
-        return "Error: No project currently open"
-    
-    # First get a list of all timelines
-    timeline_count = current_project.GetTimelineCount()
+    timeline = _get_timeline_by_name(current_project, name)
+    if not timeline:
+        return f"Error: Timeline '{name}' not found"
     
-    for i in range(1, timeline_count + 1):
-        timeline = current_project.GetTimelineByIndex(i)
-        if timeline and timeline.GetName() == name:
-            # Found the timeline, set it as current
-            current_project.SetCurrentTimeline(timeline)
-            # Verify it was set
-            current_timeline = current_project.GetCurrentTimeline()
-            if current_timeline and current_timeline.GetName() == name:
-                return f"Successfully switched to timeline '{name}'"
-            else:
-                return f"Error: Failed to switch to timeline '{name}'"
-    
-    return f"Error: Timeline '{name}' not found"
+    # Found the timeline, set it as current
+    current_project.SetCurrentTimeline(timeline)
+    # Verify it was set
+    current_timeline = current_project.GetCurrentTimeline()
+    if current_timeline and current_timeline.GetName() == name:
+        return f"Successfully switched to timeline '{name}'"
+    else:
+        return f"Error: Failed to switch to timeline '{name}'"
 
 def add_marker(resolve, frame: Optional[int] = None, color: str = "Blue", note: str = "") -> str:
     """Add a marker at the specified frame in the current timeline.
@@ -248,92 +270,86 @@ def add_marker(resolve, frame: Optional[int] = None, color: str = "Blue", note:
     Returns:
         String indicating success or failure with detailed error message
     """
-    if resolve is None:
-        return "Error: Not connected to DaVinci Resolve"
-    
-    project_manager = resolve.GetProjectManager()
-    if not project_manager:
-        return "Error: Failed to get Project Manager"
-    
-    current_project = project_manager.GetCurrentProject()
-    if not current_project:
-        return "Error: No project currently open"
-    
-    current_timeline = current_project.GetCurrentTimeline()
-    if not current_timeline:
-        return "Error: No timeline currently active"
+    chain = _resolve_chain(resolve, with_timeline=True)
+    if isinstance(chain, str):
+        return f"Error: {chain}"
+    _, current_project, current_timeline = chain
     
     # Get timeline information
     try:
         timeline_start = current_timeline.GetStartFrame()
         timeline_end = current_timeline.GetEndFrame()
         timeline_name = current_timeline.GetName()
-        print(f"Timeline '{timeline_name}' frame range: {timeline_start}-{timeline_end}")
+        logger.debug("Timeline '%s' frame range: %s-%s", timeline_name, timeline_start, timeline_end)
     except Exception as e:
         return f"Error: Failed to get timeline information: {str(e)}"
     
     # Validate marker color
-    valid_colors = [
-        "Blue", "Cyan", "Green", "Yellow", "Red", "Pink", 
-        "Purple", "Fuchsia", "Rose", "Lavender", "Sky", 
-        "Mint", "Lemon", "Sand", "Cocoa", "Cream"
-    ]
-    
-    if color not in valid_colors:
-        return f"Error: Invalid marker color. Valid colors are: {', '.join(valid_colors)}"
+    if color not in _VALID_MARKER_COLORS:
+        return f"Error: Invalid marker color. Valid colors are: {_VALID_MARKER_COLORS_DISPLAY}"
     
     try:
         # Get information about clips in the timeline
         clips = []
-        for track_idx in range(1, 5):  # Check first 4 video tracks
+        # Check the first 4 video tracks, skipping calls for tracks that do not exist
+        track_count = min(current_timeline.GetTrackCount("video") or 0, 4)
+        for track_idx in range(1, track_count + 1):
             try:
                 track_clips = current_timeline.GetItemListInTrack("video", track_idx)
-                if track_clips and len(track_clips) > 0:
-                    clips.extend(track_clips)
-            except:
+            except Exception as e:
+                logger.debug("Video track %d unavailable: %s", track_idx, e)
                 continue
+            if track_clips:
+                clips.extend(track_clips)
         
         if not clips:
             return "Error: No clips found in timeline. Add media to the timeline first."
         
+        # Fetch each clip's frame range once; every Get call is a roundtrip into Resolve
+        spans = [(clip.GetStart(), clip.GetEnd()) for clip in clips]
+        
+        # Sorted starts with the furthest end reached so far, so a bisect
+        # answers containment even when clips on different tracks overlap
+        sorted_spans = sorted(spans)
+        span_starts = [start for start, _ in sorted_spans]
+        span_reach = list(accumulate((end for _, end in sorted_spans), max))
+        
+        def in_any_clip(f: int) -> bool:
+            i = bisect.bisect_right(span_starts, f) - 1
+            return i >= 0 and span_reach[i] >= f
+        
         # Get existing markers to avoid conflicts
-        existing_markers = current_timeline.GetMarkers() or {}
+        marker_frames = frozenset(current_timeline.GetMarkers() or ())
         
         # If no frame specified, find a good position
         if frame is None:
             # Try to find a frame in the middle of a clip that doesn't have a marker
-            for clip in clips:
-                clip_start = clip.GetStart()
-                clip_end = clip.GetEnd()
-                
+            for clip_start, clip_end in spans:
                 # Try middle of clip
                 mid_frame = clip_start + ((clip_end - clip_start) // 2)
-                if mid_frame not in existing_markers:
+                if mid_frame not in marker_frames:
                     frame = mid_frame
                     break
                 
                 # Try middle + 1
-                if (mid_frame + 1) not in existing_markers:
+                if (mid_frame + 1) not in marker_frames:
                     frame = mid_frame + 1
                     break
                 
                 # Try other positions in the clip
-                for offset in [10, 20, 30, 40, 50]:
-                    test_frame = clip_start + offset
-                    if clip_start <= test_frame <= clip_end and test_frame not in existing_markers:
-                        frame = test_frame
-                        break
+                frame = next((
+                    clip_start + offset for offset in (10, 20, 30, 40, 50)
+                    if clip_start + offset <= clip_end and clip_start + offset not in marker_frames
+                ), None)
+                if frame is not None:
+                    break
             
             # If we still don't have a frame, use the first valid position we can find
             if frame is None:
                 for f in range(timeline_start, timeline_end, 10):
-                    if f not in existing_markers:
-                        # Check if this frame is within a clip
-                        for clip in clips:
-                            if clip.GetStart() <= f <= clip.GetEnd():
-                                frame = f
-                                break
-                    if frame is not None:
+                    # Check if this frame is within a clip
+                    if f not in marker_frames and in_any_clip(f):
+                        frame = f
                         break
             
             # If we still don't have a frame, report error
@@ -347,32 +363,25 @@ def add_marker(resolve, frame: Optional[int] = None, color: str = "Blue", note:
                 return f"Error: Frame {frame} is out of timeline bounds ({timeline_start}-{timeline_end})"
             
             # Check if frame already has a marker
-            if frame in existing_markers:
+            if frame in marker_frames:
                 # Suggest an alternate frame
                 alternate_found = False
                 alternates = [frame + 1, frame - 1, frame + 2, frame + 5, frame + 10]
                 
                 for alt_frame in alternates:
-                    if timeline_start <= alt_frame <= timeline_end and alt_frame not in existing_markers:
+                    if timeline_start <= alt_frame <= timeline_end and alt_frame not in marker_frames:
                         # Check if frame is within a clip
-                        for clip in clips:
-                            if clip.GetStart() <= alt_frame <= clip.GetEnd():
-                                return f"Error: A marker already exists at frame {frame}. Try frame {alt_frame} instead."
+                        if in_any_clip(alt_frame):
+                            return f"Error: A marker already exists at frame {frame}. Try frame {alt_frame} instead."
                 
                 return f"Error: A marker already exists at frame {frame}. Try a different frame position."
             
             # Verify frame is within a clip
-            frame_in_clip = False
-            for clip in clips:
-                if clip.GetStart() <= frame <= clip.GetEnd():
-                    frame_in_clip = True
-                    break
-            
-            if not frame_in_clip:
+            if not in_any_clip(frame):
                 return f"Error: Frame {frame} is not within any media in the timeline. Markers must be on actual clips."
         
         # Add the marker
-        print(f"Adding marker at frame {frame} with color {color}")
+        logger.debug("Adding marker at frame %s with color %s", frame, color)
         marker_result = current_timeline.AddMarker(
             frame,  # frameId
             color,  # color
@@ -400,28 +409,13 @@ def delete_timeline(resolve, name: str) -> str:
     Returns:
         String indicating success or failure with detailed error message
     """
-    if resolve is None:
-        return "Error: Not connected to DaVinci Resolve"
-    
-    project_manager = resolve.GetProjectManager()
-    if not project_manager:
-        return "Error: Failed to get Project Manager"
-    
-    current_project = project_manager.GetCurrentProject()
-    if not current_project:
-        return "Error: No project currently open"
+    chain = _resolve_chain(resolve)
+    if isinstance(chain, str):
+        return f"Error: {chain}"
+    _, current_project, _ = chain
     
     # First check if the timeline exists
-    timeline_count = current_project.GetTimelineCount()
-    target_timeline = None
-    
-    # Find the timeline by name
-    for i in range(1, timeline_count + 1):
-        timeline = current_project.GetTimelineByIndex(i)
-        if timeline and timeline.GetName() == name:
-            target_timeline = timeline
-            break
-    
+    target_timeline = _get_timeline_by_name(current_project, name)
     if not target_timeline:
         return f"Error: Timeline '{name}' not found"
     
@@ -431,7 +425,7 @@ def delete_timeline(resolve, name: str) -> str:
         # We shouldn't delete the current timeline - need to switch to another one first
         # Find another timeline to switch to
         another_timeline = None
-        for i in range(1, timeline_count + 1):
+        for i in range(1, current_project.GetTimelineCount() + 1):
             timeline = current_project.GetTimelineByIndex(i)
             if timeline and timeline.GetName() != name:
                 another_timeline = timeline
@@ -449,6 +443,7 @@ def delete_timeline(resolve, name: str) -> str:
         result = current_project.DeleteTimelines([target_timeline])
         
         if result:
+            _timeline_cache.pop(name, None)
             return f"Successfully deleted timeline '{name}'"
         else:
             return f"Failed to delete timeline '{name}'"
@@ -465,28 +460,16 @@ def get_timeline_tracks(resolve, timeline_name: str = None) -> Dict[str, Any]:
     Returns:
         Dictionary with track information
     """
-    if resolve is None:
-        return {"error": "Not connected to DaVinci Resolve"}
-    
-    project_manager = resolve.GetProjectManager()
-    if not project_manager:
-        return {"error": "Failed to get Project Manager"}
-    
-    current_project = project_manager.GetCurrentProject()
-    if not current_project:
-        return {"error": "No project currently open"}
+    chain = _resolve_chain(resolve)
+    if isinstance(chain, str):
+        return {"error": chain}
+    _, current_project, _ = chain
     
     # Determine which timeline to use
     timeline = None
     if timeline_name:
         # Find the timeline by name
-        timeline_count = current_project.GetTimelineCount()
-        for i in range(1, timeline_count + 1):
-            t = current_project.GetTimelineByIndex(i)
-            if t and t.GetName() == timeline_name:
-                timeline = t
-                break
-        
+        timeline = _get_timeline_by_name(current_project, timeline_name)
         if not timeline:
             return {"error": f"Timeline '{timeline_name}' not found"}
     else:
@@ -9,7 +9,6 @@ import sys
 import argparse
 import logging
 from pathlib import Path
-import netifaces
 
 # Add the parent directory to sys.path to ensure imports work
 project_dir = Path(__file__).parent.parent
@@ -17,7 +16,6 @@ sys.path.insert(0, str(project_dir))
 
 # Import the connection utils first to set environment variables
 from src.utils.resolve_connection import check_environment_variables, set_default_environment_variables
-from src.resolve_mcp_server import create_mcp_instance, register_mcp_resources
 from src.utils.logger import logger
 # Set up logging
 # logging.basicConfig(
@@ -36,31 +34,22 @@ def check_setup():
         
     return True
 
-def get_all_ip_addresses():
-    """Retrieve all non-loopback IP addresses."""
-    try:
-        # Get all network interfaces
-        interfaces = netifaces.interfaces()
-        ip_list = []
-        
-        # Iterate over each interface
-        for interface in interfaces:
-            # Get address information for the interface
-            addrs = netifaces.ifaddresses(interface)
-            # Check if IPv4 address (AF_INET) exists
-            if netifaces.AF_INET in addrs:
-                for addr in addrs[netifaces.AF_INET]:
-                    ip = addr.get('addr')
-                    if ip and ip != '127.0.0.1':  # Exclude local loopback address
-                        ip_list.append((interface, ip))
-        
-        return ip_list if ip_list else "No non-loopback IP addresses found"
-    except Exception as e:
-        return f"Failed to retrieve IP addresses: {e}"
+def iter_ip_addresses():
+    """Yield (interface, ip) for each non-loopback IPv4 address; netifaces errors propagate."""
+    # Imported on first use so argument parsing does not load the native module
+    import netifaces
+    
+    for interface in netifaces.interfaces():
+        # Get the IPv4 (AF_INET) addresses of the interface, if any
+        for addr in netifaces.ifaddresses(interface).get(netifaces.AF_INET, ()):
+            ip = addr.get('addr')
+            if ip and ip != '127.0.0.1':  # Exclude local loopback address
+                yield interface, ip
 
 def run_server(debug=False, port=8020, mode="streamable-http"):
     """Run the MCP server with the specified mode."""
-    from src.resolve_mcp_server import create_mcp_instance
+    # The server module registers every tool, so it is only imported when serving
+    from src.resolve_mcp_server import create_mcp_instance, register_mcp_resources
     
     # Set logging level based on debug flag
     if debug:
@@ -81,18 +70,21 @@ def run_server(debug=False, port=8020, mode="streamable-http"):
         logger.error(str(e))
         return 1
     
+    # Log IP addresses for streamable-http mode, as each is found
+    if mode == "streamable-http":
+        try:
+            any_found = False
+            for _, ip in iter_ip_addresses():
+                logger.print(f"http://{ip}:{port}/mcp")
+                any_found = True
+            if not any_found:
+                logger.error("No non-loopback IP addresses found")
+        except Exception as e:
+            logger.error(f"Failed to retrieve IP addresses: {e}")
+    
     # Run the server with the specified mode
     logger.info(f"Starting DaVinci Resolve MCP Server in {mode} mode...")
     mcp.run(transport=mode, mount_path="/mcp" if mode == "streamable-http" else None)
-
-    # Log IP addresses for streamable-http mode
-    if mode == "streamable-http":
-        ip_list = get_all_ip_addresses()
-        if isinstance(ip_list, str):
-            logger.error(ip_list)
-        else:
-            for interface, ip in ip_list:
-                logger.info(f"http://{ip}:{port}/mcp")
     
     return 0
 
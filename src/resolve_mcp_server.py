@@ -1046,6 +1046,29 @@ def register_mcp_resources(mcp: FastMCP):
             logger.error(f"Error importing media '{file_path}': {str(e)}")
             return f"Error importing media '{file_path}': {str(e)}"
 
+    @mcp.tool()
+    def import_media_batch(file_paths: List[str]) -> str:
+        """Import several media files into the current project's media pool at once.
+        
+        Args:
+            file_paths: The paths to the media files to import.
+        
+        Returns:
+            str: A message indicating the success or failure of the operation.
+                 - On success: A message with how many files were imported.
+                 - On failure: An error message describing the issue.
+        """
+        # Log the attempt to import media
+        logger.debug(f"Attempting to import {len(file_paths)} media files")
+        from api.media_operations import import_media_batch as import_media_batch_func
+        try:
+            result = import_media_batch_func(resolve, file_paths)
+            logger.info(f"Import media batch result: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"Error importing media files {file_paths}: {str(e)}")
+            return f"Error importing media files {file_paths}: {str(e)}"
+
     @mcp.tool()
     def delete_media(clip_name: str) -> str:
         """Delete a media clip from the media pool by name.
@@ -6522,6 +6545,10 @@ def register_mcp_resources(mcp: FastMCP):
         logger.info(f"Successfully retrieved task history with {len(result)} entries")
         return result
 
+    # The agent's executor caches the server's tool table; rebuild it on next use
+    if agent is not None:
+        agent.executor.invalidate_tools()
+
 # Start the server
 if __name__ == "__main__":
     try:
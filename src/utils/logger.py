@@ -33,6 +33,7 @@ import logging
 import sys
 import os
 import configparser
+import functools
 from typing import Optional
 import logging.handlers
 import gzip
@@ -53,9 +54,24 @@ class CustomLogger(logging.Logger):
             level (int): The logging level. Defaults to logging.NOTSET.
         """
         super().__init__(name, level)
+        # Attached once; the filter passes only records this logger's print() tags
         self.console_handler = logging.StreamHandler(sys.stdout)
         self.console_handler.setFormatter(logging.Formatter('%(message)s'))
-        self.has_console = False
+        self.console_handler.addFilter(self._is_console_record)
+        self.addHandler(self.console_handler)
+
+    def _is_console_record(self, record: logging.LogRecord) -> bool:
+        """
+        Filter for the console handler: accept only records printed by this logger,
+        so prints from child loggers are not echoed again on propagation.
+
+        Args:
+            record (logging.LogRecord): The record being handled.
+
+        Returns:
+            bool: True if the record should be written to the console.
+        """
+        return getattr(record, '_to_console', False) and record.name == self.name
 
     def print(self, message: str, *args, **kwargs) -> None:
         """
@@ -67,37 +83,8 @@ class CustomLogger(logging.Logger):
             *args: Arguments to format the message string.
             **kwargs: Additional keyword arguments (not used directly by formatting).
         """
-        try:
-            frame = sys._getframe(2)
-            filename = os.path.basename(frame.f_code.co_filename)
-            lineno = frame.f_lineno
-            func_name = frame.f_code.co_name
-        except ValueError:
-            frame = sys._getframe(1)
-            filename = os.path.basename(frame.f_code.co_filename)
-            lineno = frame.f_lineno
-            func_name = frame.f_code.co_name
-
-        record = self.makeRecord(
-            self.name,
-            logging.INFO,
-            filename,
-            lineno,
-            message,
-            args,
-            None,
-            func=func_name,
-            sinfo=None,
-        )
-
-        if not self.has_console:
-            self.addHandler(self.console_handler)
-            self.has_console = True
-
-        self.handle(record)
-
-        self.removeHandler(self.console_handler)
-        self.has_console = False
+        # stacklevel=2 makes findCaller report the caller of print()
+        self._log(logging.INFO, message, args, extra={'_to_console': True}, stacklevel=2)
 
     def exception(self, msg: str, *args, exc_info=True, **kwargs) -> None:
         """
@@ -110,11 +97,6 @@ class CustomLogger(logging.Logger):
             exc_info (bool | tuple): If True, grabs sys.exc_info(). Can also be an exc_info tuple.
             **kwargs: Additional keyword arguments passed to the underlying log method.
         """
-        frame = sys._getframe(1)
-        filename = os.path.basename(frame.f_code.co_filename)
-        lineno = frame.f_lineno
-        func_name = frame.f_code.co_name
-
         enhanced_msg = msg
         actual_exc_info = None
 
@@ -124,23 +106,14 @@ class CustomLogger(logging.Logger):
             if exc_type and exc_value:
                 enhanced_msg = f"{msg} [error_type: {exc_type.__name__}, error_detail: {str(exc_value)}]"
 
-        record = self.makeRecord(
-            self.name,
-            logging.ERROR,
-            filename,
-            lineno,
-            enhanced_msg,
-            args,
-            actual_exc_info,
-            func=func_name,
-            sinfo=None,
-        )
-
-        self.handle(record)
+        self._log(logging.ERROR, enhanced_msg, args, exc_info=actual_exc_info, stacklevel=2)
 
+@functools.lru_cache(maxsize=1)
 def _get_log_level() -> int:
     """
     Determines the logging level based on environment variable or configuration file.
+    The result is cached for the life of the process; call
+    _get_log_level.cache_clear() to pick up a changed setting.
 
     Priority:
     1. MCP_LOG_LEVEL environment variable.
@@ -213,20 +186,14 @@ def _setup_logging():
 
     def compress_rotated_file(source: str, dest: str) -> None:
         with open(source, 'rb') as f_in:
-            with gzip.open(dest, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
+            with gzip.open(dest, 'wb', compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out, length=1024 * 1024)
         os.remove(source)
 
-    original_doRollover = file_handler.doRollover
-    def doRollover_with_compression():
-        original_doRollover()
-        for f in os.listdir("logs"):
-            if f.startswith(main_script_name) and f.endswith(".log") and not f.endswith(".gz"):
-                source = os.path.join("logs", f)
-                dest = f"{source}.gz"
-                compress_rotated_file(source, dest)
-
-    file_handler.doRollover = doRollover_with_compression
+    # The handler passes the exact file it rotated, named with the .gz suffix,
+    # so no directory scan is needed and backupCount still finds old archives
+    file_handler.namer = lambda name: f"{name}.gz"
+    file_handler.rotator = compress_rotated_file
 
     root_logger.addHandler(file_handler)
 
@@ -9,6 +9,9 @@ from .platform import get_platform, get_resolve_paths, setup_environment
 
 logger = logging.getLogger("davinci-resolve-mcp.connection")
 
+# Environment variables the scripting module needs to locate Resolve
+_REQUIRED_VARS = ("RESOLVE_SCRIPT_API", "RESOLVE_SCRIPT_LIB")
+
 def initialize_resolve():
     """Initialize connection to DaVinci Resolve application."""
     try:
@@ -56,20 +59,14 @@ def initialize_resolve():
 
 def check_environment_variables():
     """Check if the required environment variables are set."""
-    resolve_script_api = os.environ.get("RESOLVE_SCRIPT_API")
-    resolve_script_lib = os.environ.get("RESOLVE_SCRIPT_LIB")
-    
-    missing_vars = []
-    if not resolve_script_api:
-        missing_vars.append("RESOLVE_SCRIPT_API")
-    if not resolve_script_lib:
-        missing_vars.append("RESOLVE_SCRIPT_LIB")
+    values = {var: os.environ.get(var) for var in _REQUIRED_VARS}
+    missing_vars = [var for var, value in values.items() if not value]
     
     return {
-        "all_set": len(missing_vars) == 0,
+        "all_set": not missing_vars,
         "missing": missing_vars,
-        "resolve_script_api": resolve_script_api,
-        "resolve_script_lib": resolve_script_lib
+        "resolve_script_api": values["RESOLVE_SCRIPT_API"],
+        "resolve_script_lib": values["RESOLVE_SCRIPT_LIB"]
     }
 
 def set_default_environment_variables():